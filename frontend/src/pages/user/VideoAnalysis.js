@@ -122,6 +122,7 @@ function VideoAnalysis() {
   const [reportsLoading, setReportsLoading] = useState(false);
   const [reportsError, setReportsError] = useState("");
   const [isAnalyzing, setIsAnalyzing] = useState(false);
+  const [sessionStarted, setSessionStarted] = useState(false);
   const [timeRemaining, setTimeRemaining] = useState(0);
   const videoRef = useRef(null);
   const navigate = useNavigate();
@@ -139,32 +140,33 @@ function VideoAnalysis() {
     }
   }, [userId, token, navigate]);
 
-  // Status polling during analysis
+  // Status updates pushed by the server during analysis (only changed fields);
+  // opened once /analyze has created the session, closed when it ends or is stopped
   useEffect(() => {
-    let interval;
-    if (isAnalyzing) {
-      interval = setInterval(async () => {
-        try {
-          const response = await axios.get("http://127.0.0.1:5002/status", {
-            headers: { Authorization: `Bearer ${token}` },
-          });
-          console.log("Status response:", response.data);
-          if (!response.data.running) {
-            clearInterval(interval);
-            fetchResults();
-          } else {
-            setTimeRemaining(response.data.time_remaining);
-          }
-        } catch (err) {
-          console.error("Status error:", err);
-          setError("Failed to check analysis status.");
-          setIsAnalyzing(false);
-          clearInterval(interval);
-        }
-      }, 1000);
-    }
-    return () => clearInterval(interval);
-  }, [isAnalyzing, token]);
+    if (!isAnalyzing || !sessionStarted) return undefined;
+    const source = new EventSource(`http://127.0.0.1:5002/status/stream?token=${token}`);
+    source.addEventListener("status", (event) => {
+      const status = JSON.parse(event.data);
+      console.log("Status update:", status);
+      if (status.running === false) {
+        source.close();
+        setSessionStarted(false);
+        fetchResults();
+      } else if (status.time_remaining !== undefined) {
+        setTimeRemaining(status.time_remaining);
+      }
+    });
+    source.onerror = (err) => {
+      // EventSource retries dropped connections by itself; CLOSED means it was refused
+      if (source.readyState === EventSource.CLOSED) {
+        console.error("Status error:", err);
+        setError("Failed to check analysis status.");
+        setSessionStarted(false);
+        setIsAnalyzing(false);
+      }
+    };
+    return () => source.close();
+  }, [isAnalyzing, sessionStarted, token]);
 
   const fetchReports = async () => {
     setReportsLoading(true);
@@ -213,6 +215,7 @@ function VideoAnalysis() {
     setLoading(true);
     setError("");
     setResult(null);
+    setSessionStarted(false);
     setIsAnalyzing(true);
 
     try {
@@ -227,6 +230,7 @@ function VideoAnalysis() {
       console.log("Analyze response:", response.data);
       if (response.data.success) {
         setTimeRemaining(response.data.duration);
+        setSessionStarted(true);
         if (videoRef.current) {
           videoRef.current.src = `http://127.0.0.1:5002/video_feed?token=${token}`;
           console.log("Video feed src set to:", videoRef.current.src);
@@ -247,6 +251,8 @@ function VideoAnalysis() {
   const handleStopAnalysis = async () => {
     setLoading(true);
     setError("");
+    // Close the status stream first so its final event does not fetch the results a second time
+    setSessionStarted(false);
     try {
       const response = await axios.post(
         "http://127.0.0.1:5002/stop",
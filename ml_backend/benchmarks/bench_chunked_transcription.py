@@ -0,0 +1,66 @@
+"""Time chunked, concurrent transcription against one whole-file request, offline.
+
+A local stand-in replaces the speech API: it sleeps for a fixed round-trip plus
+a per-second-of-audio cost and returns the chunk's time range as its "text".
+
+Usage: python benchmarks/bench_chunked_transcription.py [MEDIA_FILE] [--concurrency 4]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.audio import SAMPLE_RATE, decode_audio, to_audio_data
+from common.segmenter import transcribe_chunks
+
+
+# Alternating noise bursts and pauses, roughly like speech with breaths
+def synthetic_speech(seconds=180, seed=0):
+    rng = np.random.default_rng(seed)
+    parts = []
+    total = 0
+    while total < seconds * SAMPLE_RATE:
+        speech = rng.normal(0, 3000, int(SAMPLE_RATE * rng.uniform(2, 9)))
+        pause = rng.normal(0, 30, int(SAMPLE_RATE * rng.uniform(0.3, 1.2)))
+        parts += [speech, pause]
+        total += len(speech) + len(pause)
+    return np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+
+
+def stand_in_recognizer(round_trip=0.3, per_second=0.05):
+    def recognize(audio_data):
+        seconds = len(audio_data.frame_data) / (audio_data.sample_rate * audio_data.sample_width)
+        time.sleep(round_trip + seconds * per_second)
+        return f"[{seconds:.1f}s]"
+    return recognize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('media', nargs='?')
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    samples = decode_audio(args.media) if args.media else synthetic_speech()
+    recognize = stand_in_recognizer()
+    print(f"{len(samples) / SAMPLE_RATE:.1f}s of audio")
+
+    start = time.perf_counter()
+    recognize(to_audio_data(samples))
+    print(f"single request : {time.perf_counter() - start:6.2f}s")
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        start = time.perf_counter()
+        text, segments = transcribe_chunks(samples, executor, recognize)
+        elapsed = time.perf_counter() - start
+    print(f"chunked ({args.concurrency:2d})   : {elapsed:6.2f}s  {len(segments)} segments")
+    for segment in segments[:5]:
+        print(f"  {segment['start']:7.2f}-{segment['end']:7.2f}s {segment['text']}")
+
+
+if __name__ == '__main__':
+    main()
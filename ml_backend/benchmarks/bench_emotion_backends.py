@@ -0,0 +1,98 @@
+"""Compare emotion inference backends: load time, RSS and per-face / batched latency.
+
+Each backend runs in a fresh interpreter so import cost and memory (TensorFlow
+for keras) are measured separately.
+
+Usage: python benchmarks/bench_emotion_backends.py [--backend keras numpy] [--iterations 200] [--batch-size 32]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ML_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ML_BACKEND)
+from common.inference import BACKENDS
+
+PROBE = """
+import json, sys, time
+import numpy as np
+sys.path.insert(0, ML_BACKEND)
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+base_rss = rss_mb()
+start = time.perf_counter()
+from common.inference import load_emotion_backend
+backend = load_emotion_backend(BACKEND, MODEL)
+load_seconds = time.perf_counter() - start
+rng = np.random.default_rng(0)
+faces = rng.random((BATCH_SIZE, 48, 48, 1), dtype=np.float32)
+for _ in range(5):
+    backend.predict_on_batch(faces[:1])
+    backend.predict_on_batch(faces)
+single = []
+for i in range(ITERATIONS):
+    t = time.perf_counter()
+    backend.predict_on_batch(faces[i % BATCH_SIZE:i % BATCH_SIZE + 1])
+    single.append(time.perf_counter() - t)
+start = time.perf_counter()
+batches = max(1, ITERATIONS // 10)
+for _ in range(batches):
+    backend.predict_on_batch(faces)
+batch_seconds = (time.perf_counter() - start) / batches
+single.sort()
+print('@@' + json.dumps({
+    'engine': backend.name,
+    'load_seconds': load_seconds,
+    'rss_mb': rss_mb() - base_rss,
+    'p50_ms': single[len(single) // 2] * 1000,
+    'p95_ms': single[int(len(single) * 0.95)] * 1000,
+    'batch_ms': batch_seconds * 1000,
+    'faces_per_sec': BATCH_SIZE / batch_seconds,
+}))
+"""
+
+
+def run_backend(name, model, iterations, batch_size):
+    code = (PROBE.replace('ML_BACKEND', repr(ML_BACKEND))
+            .replace('BACKEND', repr(name))
+            .replace('MODEL', repr(model))
+            .replace('ITERATIONS', str(iterations))
+            .replace('BATCH_SIZE', str(batch_size)))
+    output = subprocess.run([sys.executable, '-c', code], cwd=ML_BACKEND, capture_output=True, text=True)
+    for line in output.stdout.splitlines():
+        if line.startswith('@@'):
+            return json.loads(line[2:])
+    error = output.stderr.strip().splitlines()
+    print(f"{name:>8}: failed ({error[-1] if error else output.returncode})")
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--backend', choices=sorted(BACKENDS), nargs='+', default=sorted(BACKENDS))
+    parser.add_argument('--model', action='append', default=[], metavar='BACKEND=PATH', help='model file per backend')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+    models = dict(item.split('=', 1) for item in args.model)
+
+    print(f"{'backend':>8} {'load s':>7} {'RSS MB':>7} {'p50 ms':>7} {'p95 ms':>7} {f'batch{args.batch_size} ms':>11} {'faces/s':>8}")
+    for name in args.backend:
+        stats = run_backend(name, models.get(name), args.iterations, args.batch_size)
+        if stats and stats['engine'] != name:
+            print(f"{name:>8}: not loaded (fell back to {stats['engine']}; see tools/evaluate_int8_model.py)")
+        elif stats:
+            print(f"{name:>8} {stats['load_seconds']:>7.2f} {stats['rss_mb']:>7.0f} {stats['p50_ms']:>7.2f} "
+                  f"{stats['p95_ms']:>7.2f} {stats['batch_ms']:>11.2f} {stats['faces_per_sec']:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Compare per-face and batched emotion inference on the faces of one video.
+
+Usage: python benchmarks/bench_emotion_batch.py VIDEO [--model emotion_classifier.h5] [--batch-sizes 32 64]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.emotion import EmotionBatcher, label_from_preds
+
+CONFIDENT_CLASSES = (1, 3, 4)
+NOT_CONFIDENT_CLASS = 2
+
+
+# Collect BGR face crops the same way detect_emotions samples them
+def collect_faces(video_file, frame_skip=10):
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    cap = cv2.VideoCapture(video_file)
+    crops = []
+    total_frames = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        total_frames += 1
+        if total_frames % frame_skip != 0:
+            continue
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        for (x, y, w, h) in face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)):
+            crops.append(frame[y:y+h, x:x+w])
+    cap.release()
+    return crops
+
+
+# The original one-model-call-per-face path from upload_audio_video/app.py
+def per_face(model, crops):
+    labels = []
+    for bgr in crops:
+        face_roi = cv2.resize(bgr, (48, 48))
+        face_roi = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
+        face_roi = face_roi.astype("float") / 255.0
+        face_roi = np.expand_dims(np.expand_dims(face_roi, axis=0), axis=-1)
+        preds = model.predict(face_roi, verbose=0)[0]
+        labels.append(label_from_preds(preds, CONFIDENT_CLASSES, NOT_CONFIDENT_CLASS)[0])
+    return labels
+
+
+def batched(model, crops, batch_size):
+    batcher = EmotionBatcher(model, batch_size, CONFIDENT_CLASSES, NOT_CONFIDENT_CLASS)
+    for bgr in crops:
+        batcher.add(bgr)
+    batcher.flush()
+    return batcher.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('video')
+    parser.add_argument('--model', default='./emotion_classifier.h5')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[32, 64])
+    args = parser.parse_args()
+
+    from keras.models import load_model
+    model = load_model(args.model)
+    crops = collect_faces(args.video)
+    if not crops:
+        sys.exit("No faces found in video")
+    print(f"{len(crops)} faces collected")
+
+    start = time.perf_counter()
+    reference = per_face(model, crops)
+    elapsed = time.perf_counter() - start
+    ref_counts = {label: reference.count(label) for label in ("Confident", "Not Confident")}
+    print(f"per-face        : {len(crops) / elapsed:8.1f} faces/sec  {ref_counts}")
+
+    mismatched = False
+    for batch_size in args.batch_sizes:
+        batched(model, crops[:batch_size], batch_size)  # warm up the batch shape
+        start = time.perf_counter()
+        counts = batched(model, crops, batch_size)
+        elapsed = time.perf_counter() - start
+        counts = {label: counts[label] for label in ("Confident", "Not Confident")}
+        match = counts == ref_counts
+        mismatched |= not match
+        print(f"batched ({batch_size:3d}) : {len(crops) / elapsed:8.1f} faces/sec  {counts}  {'match' if match else 'MISMATCH'}")
+    sys.exit(1 if mismatched else 0)
+
+
+if __name__ == '__main__':
+    main()
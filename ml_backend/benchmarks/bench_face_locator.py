@@ -0,0 +1,101 @@
+"""Compare detect-then-track face localisation with full-resolution Haar detection on every frame.
+
+Reports frames/sec of both paths and how well the tracked boxes agree with the
+full-resolution ones (recall / precision at IoU >= --iou and mean IoU of matches).
+
+Usage: python benchmarks/bench_face_locator.py --video talk.mp4 [--detect-every 5] [--detect-width 480] [--sample-fps 0]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.emotion import FACE_DETECT_PARAMS
+from common.face_tracker import FACE_DETECT_EVERY, FACE_DETECT_WIDTH, FaceLocator
+from common.frame_sampler import FrameSampler
+
+
+def iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    w = min(ax + aw, bx + bw) - max(ax, bx)
+    h = min(ay + ah, by + bh) - max(ay, by)
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    return inter / (aw * ah + bw * bh - inter)
+
+
+# Greedy one-to-one matching of boxes by IoU; returns the IoUs of matched pairs
+def match_boxes(expected, actual, threshold):
+    pairs = sorted(((iou(e, a), i, j) for i, e in enumerate(expected) for j, a in enumerate(actual)), reverse=True)
+    used_e, used_a, matched = set(), set(), []
+    for score, i, j in pairs:
+        if score < threshold or i in used_e or j in used_a:
+            continue
+        used_e.add(i)
+        used_a.add(j)
+        matched.append(score)
+    return matched
+
+
+def read_frames(path, sample_fps, limit):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise SystemExit(f"Could not open {path}")
+    frames = []
+    if sample_fps:
+        for _, frame in FrameSampler(cap, sample_fps):
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+            if len(frames) >= limit:
+                break
+    else:
+        while len(frames) < limit:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+    cap.release()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--video', required=True)
+    parser.add_argument('--detect-every', type=int, default=FACE_DETECT_EVERY)
+    parser.add_argument('--detect-width', type=int, default=FACE_DETECT_WIDTH)
+    parser.add_argument('--sample-fps', type=float, default=0, help='sample like detect_emotions (0 = every frame, like the webcam)')
+    parser.add_argument('--max-frames', type=int, default=600)
+    parser.add_argument('--iou', type=float, default=0.5)
+    args = parser.parse_args()
+
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    frames = read_frames(args.video, args.sample_fps, args.max_frames)
+    print(f"{len(frames)} frames of {frames[0].shape[1]}x{frames[0].shape[0]}")
+
+    start = time.perf_counter()
+    expected = [cascade.detectMultiScale(gray, **FACE_DETECT_PARAMS) for gray in frames]
+    full_seconds = time.perf_counter() - start
+
+    locator = FaceLocator(cascade, detect_every=args.detect_every, detect_width=args.detect_width)
+    start = time.perf_counter()
+    actual = [list(locator.locate(gray)) for gray in frames]
+    tracked_seconds = time.perf_counter() - start
+
+    expected_total = sum(len(boxes) for boxes in expected)
+    actual_total = sum(len(boxes) for boxes in actual)
+    matched = [score for e, a in zip(expected, actual) for score in match_boxes([tuple(b) for b in e], a, args.iou)]
+
+    print(f"full resolution: {len(frames) / full_seconds:7.1f} frames/s, {expected_total} boxes")
+    print(f"detect + track:  {len(frames) / tracked_seconds:7.1f} frames/s, {actual_total} boxes "
+          f"({full_seconds / tracked_seconds:.1f}x), {locator.stats()}")
+    print(f"agreement: recall {len(matched) / expected_total if expected_total else 1:.3f}, "
+          f"precision {len(matched) / actual_total if actual_total else 1:.3f}, "
+          f"mean IoU {sum(matched) / len(matched) if matched else 0:.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Compare continuous speech capture with listen-then-recognize on the same audio, offline.
+
+A local stand-in replaces the speech API: it sleeps for a fixed round-trip plus
+a per-second-of-audio cost. The listen-then-recognize loop is simulated on the
+utterances the VAD finds: any utterance that starts while the previous one is
+still being recognised is lost. The continuous pipeline really runs, with the
+audio played back --speed times faster than real time (and the stand-in's
+delays scaled to match); lags are reported in real-time milliseconds.
+
+Usage: python benchmarks/bench_live_transcription.py [WAV_FILE] [--seconds 120] [--speed 10] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.live_audio import EnergyVAD, LiveTranscriber, SyntheticSource, WavFileSource
+
+
+# (start, end) seconds of each utterance EnergyVAD cuts from the whole signal
+def cut_utterances(samples, sample_rate):
+    vad = EnergyVAD(sample_rate)
+    frames = samples[:len(samples) // vad.frame_len * vad.frame_len].astype(np.float32).reshape(-1, vad.frame_len)
+    cuts = [vad.update(energy) for energy in np.sqrt(np.mean(frames * frames, axis=1))] + [vad.flush()]
+    return [(first * vad.frame_len / sample_rate, end * vad.frame_len / sample_rate) for first, end in filter(None, cuts)]
+
+
+def recognition_seconds(audio_seconds, round_trip, per_second):
+    return round_trip + audio_seconds * per_second
+
+
+def stand_in_recognizer(round_trip, per_second, speed):
+    def recognize(audio_data):
+        seconds = len(audio_data.frame_data) / (audio_data.sample_rate * audio_data.sample_width)
+        time.sleep(recognition_seconds(seconds, round_trip, per_second) / speed)
+        return f"[{seconds:.1f}s]"
+    return recognize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('wav', nargs='?')
+    parser.add_argument('--seconds', type=float, default=120, help='length of the synthetic signal')
+    parser.add_argument('--speed', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--round-trip', type=float, default=1.0, help='stand-in seconds per request')
+    parser.add_argument('--per-second', type=float, default=0.1, help='stand-in seconds per second of audio')
+    args = parser.parse_args()
+
+    source = WavFileSource(args.wav, speed=args.speed) if args.wav else SyntheticSource(args.seconds, speed=args.speed)
+    utterances = cut_utterances(source.samples, source.sample_rate)
+    speech_seconds = sum(end - start for start, end in utterances)
+    print(f"{len(source.samples) / source.sample_rate:.1f}s of audio, {len(utterances)} utterances, {speech_seconds:.1f}s of speech")
+
+    resume_at, lost, lost_seconds = 0.0, 0, 0.0
+    for start, end in utterances:
+        if start < resume_at:
+            lost += 1
+            lost_seconds += end - start
+            continue
+        resume_at = end + recognition_seconds(end - start, args.round_trip, args.per_second)
+    print(f"listen then recognize: {len(utterances) - lost} transcribed, {lost} lost ({lost_seconds:.1f}s of speech)")
+
+    recognize = stand_in_recognizer(args.round_trip, args.per_second, args.speed)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        transcriber = LiveTranscriber(source, executor, recognize)
+        start = time.perf_counter()
+        transcriber.run()
+        transcriber.drain()
+        elapsed = time.perf_counter() - start
+    stats = transcriber.stats()
+    lag = {key: round(value * args.speed) if value is not None else None for key, value in stats["lag_ms"].items()}
+    print(f"continuous ({args.workers:2d} workers): {stats['recognized']} transcribed, {stats['skipped']} skipped, "
+          f"{stats['failed']} failed, lag avg {lag['avg']} ms p95 {lag['p95']} ms ({elapsed:.1f}s wall)")
+
+
+if __name__ == '__main__':
+    main()
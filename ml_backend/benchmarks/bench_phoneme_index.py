@@ -0,0 +1,101 @@
+"""Compare startup time, RSS and lookup speed of cmudict.dict() against the memory-mapped phoneme index.
+
+Usage: python benchmarks/bench_phoneme_index.py [--index data/cmudict_phonemes.idx] [--lookups 100000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ML_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ML_BACKEND)
+from common.phonemes import DEFAULT_INDEX_PATH, PhonemeIndex
+
+# Each loader runs in a fresh interpreter so its RSS is not shared with the other
+LOADERS = {
+    'cmudict.dict()': """
+from nltk.corpus import cmudict
+table = cmudict.dict()
+lookup = lambda word: len(table.get(word.lower(), [[]])[0])
+""",
+    'phoneme index': """
+from common.phonemes import PhonemeIndex
+index = PhonemeIndex(INDEX_PATH)
+lookup = index.phoneme_count
+""",
+}
+
+PROBE = """
+import json, os, random, resource, sys, time
+sys.path.insert(0, ML_BACKEND)
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+base_rss = rss_kb()
+start = time.perf_counter()
+LOADER
+startup = time.perf_counter() - start
+loaded_rss = rss_kb()
+with open(SAMPLE_PATH) as f:
+    sample = json.load(f)
+rng = random.Random(0)
+queries = [rng.choice(sample) for _ in range(LOOKUPS)]
+start = time.perf_counter()
+hits = sum(1 for word in queries if lookup(word))
+lookup_seconds = time.perf_counter() - start
+print(json.dumps({
+    'startup_seconds': round(startup, 4),
+    'rss_delta_mb': round((loaded_rss - base_rss) / 1024, 1),
+    'lookups_per_sec': round(LOOKUPS / lookup_seconds),
+    'hit_rate': round(hits / LOOKUPS, 3),
+}))
+"""
+
+
+def run_loader(name, loader, index_path, sample_path, lookups):
+    code = (PROBE.replace('LOADER', loader.strip())
+            .replace('ML_BACKEND', repr(ML_BACKEND))
+            .replace('INDEX_PATH', repr(index_path))
+            .replace('SAMPLE_PATH', repr(sample_path))
+            .replace('LOOKUPS', str(lookups)))
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    if output.returncode != 0:
+        print(f"{name}: failed\n{output.stderr.strip()}")
+        return None
+    return json.loads(output.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--index', default=os.environ.get('PHONEME_INDEX', DEFAULT_INDEX_PATH))
+    parser.add_argument('--lookups', type=int, default=100000)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.index):
+        parser.error(f"{args.index} not found; run tools/build_phoneme_index.py first")
+
+    # Query words sampled from the index, plus misses, shared by both loaders
+    index = PhonemeIndex(args.index)
+    sample = [index._word(i).decode('utf-8') for i in range(0, index.size, 50)]
+    sample += [f"zz{word}qq" for word in sample[::10]]
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(sample, f)
+
+    print(f"{'loader':>16} {'startup s':>10} {'RSS MB':>8} {'lookups/s':>11} {'hit rate':>9}")
+    for name, loader in LOADERS.items():
+        stats = run_loader(name, loader, args.index, f.name, args.lookups)
+        if stats:
+            print(f"{name:>16} {stats['startup_seconds']:>10.4f} {stats['rss_delta_mb']:>8.1f} "
+                  f"{stats['lookups_per_sec']:>11} {stats['hit_rate']:>9.3f}")
+    os.remove(f.name)
+
+
+if __name__ == '__main__':
+    main()
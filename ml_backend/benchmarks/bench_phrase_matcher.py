@@ -0,0 +1,89 @@
+"""Compare the single-pass phrase matcher with the per-phrase substring scan it replaced.
+
+Usage: python benchmarks/bench_phrase_matcher.py [--segments 2000] [--phrases realtime_webcam/phrases.json]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ML_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ML_BACKEND)
+from common.phrase_matcher import PhraseMatcher
+
+try:
+    from nltk.tokenize import word_tokenize
+    word_tokenize("warm up")
+except Exception:
+    word_tokenize = str.split
+
+
+# The previous analyze_speech_confidence scan: two substring passes per list,
+# two tokenizations and a token-level filler check
+def legacy_analyze(text, confident_phrases, unconfident_phrases, filler_words):
+    lowered = text.lower()
+    confident_count = sum(1 for phrase in confident_phrases if phrase in lowered)
+    unconfident_count = sum(1 for phrase in unconfident_phrases if phrase in lowered)
+    used_unconfident = [phrase for phrase in unconfident_phrases if phrase in lowered] if unconfident_count else []
+    used_confident = [phrase for phrase in confident_phrases if phrase in lowered] if confident_count else []
+    word_count = len(word_tokenize(text))
+    words = word_tokenize(lowered) if word_count else []
+    fillers = [word for word in word_tokenize(lowered) if word in filler_words]
+    return confident_count, unconfident_count, used_confident, used_unconfident, words, fillers
+
+
+def matcher_analyze(text, matcher):
+    found = matcher.match(text)
+    counts = found.counts()
+    return counts["confident"], counts["unconfident"], found.phrases("confident"), found.phrases("unconfident"), found.tokens, found.positions("filler")
+
+
+def synthetic_segments(phrases, count, seed=0):
+    rng = random.Random(seed)
+    pool = [phrase for values in phrases.values() for phrase in values]
+    filler = "the project mayor timeline team budget results we delivered on schedule and".split()
+    segments = []
+    for _ in range(count):
+        words = [rng.choice(pool) if rng.random() < 0.2 else rng.choice(filler) for _ in range(rng.randint(8, 30))]
+        segments.append(" ".join(words).capitalize() + rng.choice([".", "?", "."]))
+    return segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--segments', type=int, default=2000)
+    parser.add_argument('--phrases', default=os.path.join(ML_BACKEND, 'realtime_webcam', 'phrases.json'))
+    args = parser.parse_args()
+
+    with open(args.phrases) as f:
+        phrases = json.load(f)
+    segments = synthetic_segments(phrases, args.segments)
+
+    start = time.perf_counter()
+    matcher = PhraseMatcher(phrases)
+    print(f"matcher build   : {(time.perf_counter() - start) * 1000:8.2f} ms ({len(matcher.goto)} states)")
+
+    filler_words = set(phrases["filler"])
+    start = time.perf_counter()
+    for text in segments:
+        legacy_analyze(text, phrases["confident"], phrases["unconfident"], filler_words)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in segments:
+        matcher_analyze(text, matcher)
+    single_pass = time.perf_counter() - start
+
+    print(f"substring scan  : {len(segments) / legacy:10.0f} segments/sec")
+    print(f"single pass     : {len(segments) / single_pass:10.0f} segments/sec ({legacy / single_pass:.1f}x)")
+
+    sample = "I think the mayor may be right, you know, but I'm sure we delivered."
+    print(f"\n{sample!r}")
+    print("  substring:", legacy_analyze(sample, phrases["confident"], phrases["unconfident"], filler_words)[2:4])
+    print("  matcher  :", matcher_analyze(sample, matcher)[2:4])
+
+
+if __name__ == '__main__':
+    main()
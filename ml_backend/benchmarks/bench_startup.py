@@ -0,0 +1,74 @@
+"""Measure service cold start: time until the module is imported (serving /healthz) and until /readyz models are loaded.
+
+Each service/mode pair starts in a fresh interpreter from the ml_backend directory,
+so the numbers include Python, Flask, OpenCV and (when loaded) TensorFlow imports.
+
+Usage: python benchmarks/bench_startup.py [--service upload ...] [--mode background eager ...] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ML_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVICES = {
+    'upload': 'upload_audio_video/app.py',
+    'audio': 'realtime_audio/app.py',
+    'webcam': 'realtime_webcam/webcam.py',
+}
+
+PROBE = """
+import importlib.util, json, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('service', SCRIPT)
+service = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(service)
+imported = time.perf_counter() - start
+ready = service.readiness.wait(timeout=TIMEOUT)
+loaded = time.perf_counter() - start
+print('@@' + json.dumps({
+    'import_seconds': imported,
+    'ready_seconds': loaded if ready else None,
+    'models': {r.name: r.status() for r in service.readiness.resources},
+}))
+"""
+
+
+def run_once(script, mode, timeout):
+    code = PROBE.replace('SCRIPT', repr(script)).replace('TIMEOUT', str(timeout))
+    env = dict(os.environ, MODEL_LOADING=mode)
+    output = subprocess.run([sys.executable, '-c', code], cwd=ML_BACKEND, env=env, capture_output=True, text=True)
+    for line in output.stdout.splitlines():
+        if line.startswith('@@'):
+            return json.loads(line[2:])
+    print(f"  failed: {output.stderr.strip().splitlines()[-1] if output.stderr.strip() else output.returncode}")
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--service', choices=sorted(SERVICES), nargs='+', default=sorted(SERVICES))
+    parser.add_argument('--mode', choices=['background', 'lazy', 'eager'], nargs='+', default=['background', 'eager'])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"{'service':>8} {'mode':>11} {'import s':>9} {'ready s':>8}  models")
+    for service in args.service:
+        for mode in args.mode:
+            runs = [run_once(SERVICES[service], mode, args.timeout) for _ in range(args.repeat)]
+            runs = [run for run in runs if run]
+            if not runs:
+                continue
+            imported = statistics.median(run['import_seconds'] for run in runs)
+            ready = [run['ready_seconds'] for run in runs if run['ready_seconds'] is not None]
+            ready_text = f"{statistics.median(ready):>8.2f}" if ready else f"{'never':>8}"
+            models = ", ".join(f"{name}={'ok' if status['ready'] else status['error']}" for name, status in runs[-1]['models'].items())
+            print(f"{service:>8} {mode:>11} {imported:>9.2f} {ready_text}  {models}")
+
+
+if __name__ == '__main__':
+    main()
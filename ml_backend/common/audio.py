@@ -0,0 +1,49 @@
+import subprocess
+import numpy as np
+import speech_recognition as sr
+
+# Recognizer input format: 16 kHz mono signed 16-bit PCM
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+class AudioDecodeError(Exception):
+    pass
+
+
+# Prefer the ffmpeg binary bundled with imageio-ffmpeg, else the one on PATH
+def ffmpeg_executable():
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return 'ffmpeg'
+
+
+# Decode the audio track of any ffmpeg-readable file straight into an int16
+# NumPy buffer, without writing an intermediate WAV. max_seconds caps how much
+# is decoded; callers can compare the result length against it.
+def decode_audio(file_path, sample_rate=SAMPLE_RATE, max_seconds=None):
+    cmd = [ffmpeg_executable(), '-nostdin', '-v', 'error', '-i', file_path, '-vn', '-ac', '1', '-ar', str(sample_rate)]
+    if max_seconds:
+        cmd += ['-t', str(max_seconds + 1)]
+    cmd += ['-f', 's16le', '-acodec', 'pcm_s16le', 'pipe:1']
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    except OSError as e:
+        raise AudioDecodeError(f"ffmpeg not available: {e}")
+    if proc.returncode != 0:
+        raise AudioDecodeError(proc.stderr.decode(errors='replace').strip() or f"ffmpeg exited with {proc.returncode}")
+    samples = np.frombuffer(proc.stdout, dtype=np.int16)
+    if samples.size == 0:
+        raise AudioDecodeError("No audio stream found")
+    return samples
+
+
+def duration_seconds(samples, sample_rate=SAMPLE_RATE):
+    return len(samples) / sample_rate
+
+
+# Wrap decoded PCM samples for speech_recognition
+def to_audio_data(samples, sample_rate=SAMPLE_RATE):
+    return sr.AudioData(samples.tobytes(), sample_rate, SAMPLE_WIDTH)
@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+AUTH_VALIDATE_URL = os.environ.get('AUTH_VALIDATE_URL', "http://localhost:3003/api/auth/validate-token")
+
+
+# Validates bearer tokens against the Express auth service over a keep-alive
+# connection pool. Successful validations are cached for `ttl` seconds and
+# rejections for `negative_ttl`, keyed by the token's SHA-256 so raw tokens are
+# never held in memory. Transport errors are never cached.
+class TokenValidator:
+    def __init__(self, url=AUTH_VALIDATE_URL, ttl=60, negative_ttl=5, max_entries=10000, timeout=5, pool_size=10):
+        self.url = url
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.auth_calls = 0
+        self.auth_errors = 0
+        self.auth_seconds = 0.0
+        self.auth_max_seconds = 0.0
+
+    def validate(self, token):
+        key = hashlib.sha256(token.encode()).hexdigest()
+        now = time.monotonic()
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry and entry[0] > now:
+                self.cache.move_to_end(key)
+                if entry[1].get("success"):
+                    self.hits += 1
+                else:
+                    self.negative_hits += 1
+                return entry[1]
+            self.misses += 1
+
+        start = time.perf_counter()
+        try:
+            response = self.session.post(self.url, json={"token": token}, timeout=self.timeout)
+            result = response.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.error(f"Token validation failed: {e}")
+            with self.lock:
+                self.auth_errors += 1
+            return {"success": False, "message": f"Failed to validate token: {str(e)}"}
+        finally:
+            self._record_latency(time.perf_counter() - start)
+
+        ttl = self.ttl if result.get("success") else self.negative_ttl
+        if ttl > 0:
+            with self.lock:
+                self.cache[key] = (time.monotonic() + ttl, result)
+                self.cache.move_to_end(key)
+                while len(self.cache) > self.max_entries:
+                    self.cache.popitem(last=False)
+        return result
+
+    def _record_latency(self, seconds):
+        with self.lock:
+            self.auth_calls += 1
+            self.auth_seconds += seconds
+            self.auth_max_seconds = max(self.auth_max_seconds, seconds)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "cached_tokens": len(self.cache),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0,
+                "auth_calls": self.auth_calls,
+                "auth_errors": self.auth_errors,
+                "auth_avg_ms": round(self.auth_seconds / self.auth_calls * 1000, 2) if self.auth_calls else 0,
+                "auth_max_ms": round(self.auth_max_seconds * 1000, 2),
+            }
+
+
+# Build the validator used by a service from its environment
+def token_validator_from_env():
+    return TokenValidator(
+        ttl=float(os.environ.get('AUTH_CACHE_TTL', 60)),
+        negative_ttl=float(os.environ.get('AUTH_NEGATIVE_TTL', 5)),
+        max_entries=int(os.environ.get('AUTH_CACHE_SIZE', 10000)),
+    )
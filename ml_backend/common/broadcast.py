@@ -0,0 +1,186 @@
+import logging
+import threading
+
+import cv2
+
+from common.pipeline import DropOldestQueue
+
+logger = logging.getLogger(__name__)
+
+MJPEG_PART_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+MIN_STREAM_WIDTH = 64
+JPEG_QUALITY_RANGE = (10, 100)
+
+
+# (width, quality) of one MJPEG stream from `width` / `quality` query
+# arguments; width 0 keeps the capture resolution. Raises ValueError.
+def parse_stream_profile(args, default_width=0, default_quality=95):
+    try:
+        width = int(args.get('width', default_width))
+        quality = int(args.get('quality', default_quality))
+    except ValueError:
+        raise ValueError("width and quality must be integers")
+    if width < 0:
+        raise ValueError("width must not be negative")
+    if width:
+        width = max(MIN_STREAM_WIDTH, width)
+    low, high = JPEG_QUALITY_RANGE
+    return width, min(high, max(low, quality))
+
+
+class Subscriber:
+    __slots__ = ('profile', 'queue', 'sent')
+
+    def __init__(self, profile, buffer_size):
+        self.profile = profile
+        self.queue = DropOldestQueue(buffer_size)
+        self.sent = 0
+
+
+# Shares one capture -> annotate -> encode pipeline between every MJPEG client
+# of a source. Each frame is JPEG-encoded once per distinct (width, quality)
+# profile among the current subscribers and the bytes are handed to each
+# client through its own drop-oldest buffer, so a slow client skips frames
+# without holding back the others or the capture.
+#   open_pipeline(encode) -> unstarted FramePipeline using `encode`, or None
+# The pipeline starts with the first subscriber and stops after the last one
+# leaves; its on_stop hook is where the capture device gets released.
+class MjpegBroadcaster:
+    def __init__(self, open_pipeline, buffer_size=2, name='broadcast'):
+        self.open_pipeline = open_pipeline
+        self.buffer_size = buffer_size
+        self.name = name
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.pipeline = None
+        self.pump = None
+        self.captures = 0
+        self.encodes = 0
+        self.subscribed = 0
+
+    # Generator of MJPEG parts for one client, ending when the source stops
+    def stream(self, width=0, quality=95):
+        subscriber = self._subscribe((width, quality))
+        if subscriber is None:
+            return
+        try:
+            while True:
+                data = subscriber.queue.get(timeout=1.0)
+                if data is None:
+                    if subscriber.queue.closed:
+                        break
+                    continue
+                subscriber.sent += 1
+                yield data
+        finally:
+            self._unsubscribe(subscriber)
+
+    def _active(self):
+        return self.pipeline is not None and not self.pipeline.stop_event.is_set()
+
+    def _subscribe(self, profile):
+        subscriber = Subscriber(profile, self.buffer_size)
+        with self.lock:
+            if self._active():
+                return self._add(subscriber)
+        # Starting a capture happens outside self.lock, which encode() and the
+        # pump need on every frame; start_lock only keeps two starts apart
+        with self.start_lock:
+            with self.lock:
+                if self._active():
+                    return self._add(subscriber)
+                previous = self.pipeline
+            if previous:
+                # The previous capture must be released before the device is reopened
+                for thread in previous.threads:
+                    thread.join(timeout=2)
+            pipeline = self.open_pipeline(self.encode)
+            if pipeline is None:
+                return None
+            pump = threading.Thread(target=self._pump, args=(pipeline,), name=f"{self.name}-pump", daemon=True)
+            with self.lock:
+                self.pipeline = pipeline
+                self.pump = pump
+                self.captures += 1
+                self._add(subscriber)
+            pipeline.start()
+            pump.start()
+        logger.info(f"{self.name}: capture started")
+        return subscriber
+
+    # Caller holds self.lock
+    def _add(self, subscriber):
+        self.subscribers.append(subscriber)
+        self.subscribed += 1
+        logger.info(f"{self.name}: subscriber joined ({len(self.subscribers)} watching)")
+        return subscriber
+
+    def _unsubscribe(self, subscriber):
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+            remaining = len(self.subscribers)
+            if not remaining and self.pipeline:
+                self.pipeline.stop()
+        logger.info(f"{self.name}: subscriber left ({remaining} watching)")
+
+    # Runs as the pipeline's encode stage: one JPEG per profile being watched
+    def encode(self, frame):
+        with self.lock:
+            profiles = {subscriber.profile for subscriber in self.subscribers}
+        parts = {}
+        for width, quality in profiles:
+            image = frame
+            if width and width < frame.shape[1]:
+                height = round(frame.shape[0] * width / frame.shape[1])
+                image = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                logger.error(f"{self.name}: failed to encode frame")
+                continue
+            parts[(width, quality)] = MJPEG_PART_HEADER + buffer.tobytes() + b'\r\n'
+        with self.lock:
+            self.encodes += len(parts)
+        return parts or None
+
+    def _pump(self, pipeline):
+        for parts in pipeline.frames():
+            with self.lock:
+                subscribers = list(self.subscribers)
+            for subscriber in subscribers:
+                data = parts.get(subscriber.profile)
+                if data is not None:
+                    subscriber.queue.put(data)
+        with self.lock:
+            if self.pipeline is pipeline:
+                for subscriber in self.subscribers:
+                    subscriber.queue.close()
+        logger.info(f"{self.name}: capture stopped")
+
+    def stop(self):
+        with self.lock:
+            if self.pipeline:
+                self.pipeline.stop()
+            for subscriber in self.subscribers:
+                subscriber.queue.close()
+
+    # Pipeline stats of the current (or last) capture plus per-client delivery; None before any capture
+    def stats(self):
+        with self.lock:
+            pipeline = self.pipeline
+            subscribers = [
+                {"width": s.profile[0], "quality": s.profile[1], "sent": s.sent, "dropped": s.queue.dropped}
+                for s in self.subscribers
+            ]
+            encodes = self.encodes
+        if pipeline is None:
+            return None
+        return dict(
+            pipeline.stats(),
+            active=self._active(),
+            captures=self.captures,
+            jpeg_encodes=encodes,
+            subscribed=self.subscribed,
+            subscribers=subscribers,
+        )
@@ -0,0 +1,140 @@
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+import pymysql
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+# Fixed-size pool of pymysql connections shared by request threads. Connections
+# are opened on demand up to `size`, checked out per call with `connection()`,
+# and pinged (reconnecting if MySQL dropped them) when idle for longer than
+# `ping_interval` seconds. Writers commit explicitly; whatever a checkout left
+# open is rolled back on release, so a read-only caller's REPEATABLE READ
+# snapshot never carries over to the next user of the connection.
+class ConnectionPool:
+    def __init__(self, size=5, timeout=5, ping_interval=30, **connect_kwargs):
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.connect_kwargs = dict(connect_kwargs, cursorclass=pymysql.cursors.DictCursor)
+        self.idle = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.created = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.reconnects = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def _acquire(self):
+        start = time.perf_counter()
+        conn, last_used = self._take()
+        try:
+            if time.monotonic() - last_used > self.ping_interval:
+                self._ping(conn)
+        except Exception:
+            self._discard(conn)
+            raise
+        waited = time.perf_counter() - start
+        with self.lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return conn
+
+    def _take(self):
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            can_create = self.created < self.size
+            if can_create:
+                self.created += 1
+        if can_create:
+            try:
+                return pymysql.connect(**self.connect_kwargs), time.monotonic()
+            except Exception:
+                with self.lock:
+                    self.created -= 1
+                raise
+        try:
+            return self.idle.get(timeout=self.timeout)
+        except queue.Empty:
+            with self.lock:
+                self.timeouts += 1
+            raise PoolTimeoutError(f"No database connection available within {self.timeout}s")
+
+    def _ping(self, conn):
+        thread_id = conn.thread_id() if conn.open else None
+        conn.ping(reconnect=True)
+        if conn.thread_id() != thread_id:
+            with self.lock:
+                self.reconnects += 1
+
+    def _release(self, conn):
+        with self.lock:
+            self.in_use -= 1
+        if conn.open:
+            try:
+                conn.rollback()
+            except Exception:
+                self._discard(conn)
+                return
+            self.idle.put((conn, time.monotonic()))
+        else:
+            self._discard(conn)
+
+    def _discard(self, conn):
+        with self.lock:
+            self.created -= 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        with self.lock:
+            return {
+                "size": self.size,
+                "open": self.created,
+                "in_use": self.in_use,
+                "utilisation": round(self.in_use / self.size, 4) if self.size else 0,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "reconnects": self.reconnects,
+                "avg_wait_ms": round(self.wait_seconds / self.checkouts * 1000, 2) if self.checkouts else 0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+            }
+
+
+# Build a service's pool from the environment (defaults match the local dev database)
+def pool_from_env():
+    return ConnectionPool(
+        size=int(os.environ.get('DB_POOL_SIZE', 5)),
+        timeout=float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+        ping_interval=float(os.environ.get('DB_PING_INTERVAL', 30)),
+        host=os.environ.get('DB_HOST', 'localhost'),
+        user=os.environ.get('DB_USER', 'root'),
+        password=os.environ.get('DB_PASSWORD', ''),
+        database=os.environ.get('DB_NAME', 'confidence_speaker'),
+    )
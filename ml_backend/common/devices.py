@@ -0,0 +1,142 @@
+import logging
+import threading
+
+import cv2
+
+from common.pipeline import DropOldestQueue
+
+logger = logging.getLogger(__name__)
+
+
+class DeviceSubscription:
+    __slots__ = ('shared', 'device', 'queue')
+
+    def __init__(self, shared, device, buffer_size):
+        self.shared = shared
+        self.device = device
+        self.queue = DropOldestQueue(buffer_size)
+
+    # Next item from the device, or None once the device or this subscription closed
+    def read(self):
+        while True:
+            item = self.queue.get(timeout=1.0)
+            if item is not None:
+                return item
+            if self.queue.closed:
+                return None
+
+    def close(self):
+        self.shared.unsubscribe(self)
+
+
+# One physical device (camera, microphone) read on a single thread and handed
+# to every subscriber through its own drop-oldest queue, so sessions share the
+# device instead of each opening it.
+#   open_device() -> object with read() (next item, None when exhausted) and close()
+# open_device errors propagate from subscribe(). The device opens with the
+# first subscriber and closes after the last one leaves or when it runs out.
+class SharedDevice:
+    def __init__(self, open_device, buffer_size=2, name='device'):
+        self.open_device = open_device
+        self.buffer_size = buffer_size
+        self.name = name
+        self.lock = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.subscriptions = []
+        self.device = None
+        self.stop_event = None
+        self.reader = None
+        self.opens = 0
+        self.items = 0
+
+    def _active(self):
+        return self.device is not None and not self.stop_event.is_set()
+
+    def subscribe(self):
+        with self.lock:
+            if self._active():
+                return self._add()
+        with self.start_lock:
+            with self.lock:
+                if self._active():
+                    return self._add()
+                previous = self.reader
+            if previous:
+                # The previous reader closes the device; wait for it before reopening
+                previous.join(timeout=2)
+            device = self.open_device()
+            stop_event = threading.Event()
+            reader = threading.Thread(target=self._read_loop, args=(device, stop_event), name=f"{self.name}-reader", daemon=True)
+            with self.lock:
+                self.device, self.stop_event, self.reader = device, stop_event, reader
+                self.opens += 1
+                subscription = self._add()
+            reader.start()
+        logger.info(f"{self.name}: opened")
+        return subscription
+
+    # Caller holds self.lock
+    def _add(self):
+        subscription = DeviceSubscription(self, self.device, self.buffer_size)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.queue.close()
+        with self.lock:
+            self.subscriptions = [s for s in self.subscriptions if s is not subscription]
+            if not self.subscriptions and self.stop_event and subscription.device is self.device:
+                self.stop_event.set()
+
+    def _read_loop(self, device, stop_event):
+        try:
+            while not stop_event.is_set():
+                item = device.read()
+                if item is None:
+                    break
+                with self.lock:
+                    subscriptions = list(self.subscriptions)
+                    self.items += 1
+                for subscription in subscriptions:
+                    subscription.queue.put(item)
+        except Exception as e:
+            logger.error(f"{self.name}: read failed: {e}")
+        finally:
+            stop_event.set()
+            try:
+                device.close()
+            except Exception as e:
+                logger.error(f"{self.name}: close failed: {e}")
+            with self.lock:
+                if self.device is device:
+                    for subscription in self.subscriptions:
+                        subscription.queue.close()
+                    self.subscriptions = []
+                    self.device = None
+            logger.info(f"{self.name}: closed")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "open": self._active(),
+                "subscribers": len(self.subscriptions),
+                "opens": self.opens,
+                "items": self.items,
+                "dropped": [subscription.queue.dropped for subscription in self.subscriptions],
+            }
+
+
+# cv2.VideoCapture as a SharedDevice device yielding BGR frames
+class VideoCaptureDevice:
+    def __init__(self, index=0):
+        self.cap = cv2.VideoCapture(index)
+        if not self.cap.isOpened():
+            self.cap.release()
+            raise OSError(f"Could not open video device {index}")
+
+    def read(self):
+        ok, frame = self.cap.read()
+        return frame if ok else None
+
+    def close(self):
+        self.cap.release()
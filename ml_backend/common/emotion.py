@@ -0,0 +1,97 @@
+from collections import Counter
+import os
+import cv2
+import numpy as np
+
+from common.frame_sampler import FrameSampler
+
+EMOTION_INPUT_SIZE = (48, 48)
+
+# Haar cascade settings used wherever faces are cropped for the emotion model
+FACE_DETECT_PARAMS = dict(scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+
+# (confident classes, not-confident class) of each service's predict_emotion
+SERVICE_LABEL_RULES = {
+    'upload': ((1, 3, 4), 2),  # Happy + Surprised + Neutral vs Sad
+    'webcam': ((0, 3, 4), 2),  # classes 0 + 3 + 4 vs Sad, as webcam.py has always summed them
+}
+
+# Resize a face crop, then convert a BGR one to grayscale (the order
+# predict_emotion has always used) and scale it to the model's [0, 1] input range
+def preprocess_face(face_roi):
+    face = cv2.resize(face_roi, EMOTION_INPUT_SIZE)
+    if face.ndim == 3:
+        face = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY)
+    return face.astype("float32") / 255.0
+
+# Map one row of class probabilities to the Confident / Not Confident label
+def label_from_preds(preds, confident_classes, not_confident_class):
+    confident_score = sum(preds[i] for i in confident_classes)
+    not_confident_score = preds[not_confident_class]
+    emotion_label = "Confident" if confident_score > not_confident_score else "Not Confident"
+    return emotion_label, max(confident_score, not_confident_score)
+
+# Collects preprocessed face crops into a fixed-size buffer and runs the
+# emotion model once per full batch instead of once per face
+class EmotionBatcher:
+    def __init__(self, model, batch_size, confident_classes, not_confident_class):
+        self.model = model
+        self.batch_size = max(1, int(batch_size))
+        self.confident_classes = confident_classes
+        self.not_confident_class = not_confident_class
+        self.buffer = np.empty((self.batch_size, EMOTION_INPUT_SIZE[1], EMOTION_INPUT_SIZE[0], 1), dtype=np.float32)
+        self.pending = 0
+        self.counts = Counter()
+        self.faces = 0
+        self.batches = 0
+
+    def add(self, face_roi):
+        self.buffer[self.pending, :, :, 0] = preprocess_face(face_roi)
+        self.pending += 1
+        if self.pending == self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        preds = self.model.predict_on_batch(self.buffer[:self.pending])
+        for row in np.asarray(preds):
+            emotion_label, _ = label_from_preds(row, self.confident_classes, self.not_confident_class)
+            self.counts[emotion_label] += 1
+        self.faces += self.pending
+        self.batches += 1
+        self.pending = 0
+
+# Load a fixture set of face crops as a model-ready (n, 48, 48, 1) batch: a
+# .npy array of grayscale crops, or a directory of face images
+def load_face_crops(path, limit=None):
+    if os.path.isdir(path):
+        names = sorted(name for name in os.listdir(path) if name.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')))
+        crops = [cv2.imread(os.path.join(path, name), cv2.IMREAD_GRAYSCALE) for name in names[:limit]]
+        faces = [preprocess_face(crop) for crop in crops if crop is not None]
+    else:
+        array = np.load(path)[:limit]
+        if array.ndim == 4:
+            array = array[..., 0]
+        # uint8 crops are preprocessed; float arrays are taken as already-scaled model input
+        faces = [preprocess_face(crop) if crop.dtype == np.uint8 else crop.astype(np.float32) for crop in array]
+    if not faces:
+        raise ValueError(f"No face crops found in {path}")
+    return np.stack(faces)[..., np.newaxis]
+
+
+# Grayscale face crops (uint8, 48x48) from a video, found the same way
+# detect_emotions finds them: sampled frames, then the face locator
+def iter_face_crops(video_file, cascade, sample_fps):
+    from common.face_tracker import FaceLocator
+    cap = cv2.VideoCapture(video_file)
+    try:
+        if not cap.isOpened():
+            return
+        locator = FaceLocator(cascade)
+        for _, frame in FrameSampler(cap, sample_fps):
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            for (x, y, w, h) in locator.locate(gray):
+                yield cv2.cvtColor(cv2.resize(frame[y:y+h, x:x+w], EMOTION_INPUT_SIZE), cv2.COLOR_BGR2GRAY)
+    finally:
+        cap.release()
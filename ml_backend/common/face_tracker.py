@@ -0,0 +1,92 @@
+import os
+
+import cv2
+
+from common.emotion import FACE_DETECT_PARAMS
+
+# Full-frame detection runs on every FACE_DETECT_EVERY-th frame, on a copy
+# scaled down to FACE_DETECT_WIDTH pixels wide; frames in between only search
+# a window around each face found last time
+FACE_DETECT_EVERY = int(os.environ.get('FACE_DETECT_EVERY', 5))
+FACE_DETECT_WIDTH = int(os.environ.get('FACE_DETECT_WIDTH', 480))
+ROI_MARGIN = 0.5  # window grows by this fraction of the box size on each side
+HAAR_WINDOW = 24  # smallest face the frontal cascade can find
+
+
+# Detect-then-track face localisation over consecutive frames of one stream.
+# locate() returns (x, y, w, h) boxes in full-resolution coordinates, like
+# cascade.detectMultiScale on the full frame would. When a face is not found
+# again in its window, the frame gets a full detection instead.
+class FaceLocator:
+    def __init__(self, cascade, detect_every=FACE_DETECT_EVERY, detect_width=FACE_DETECT_WIDTH,
+                 roi_margin=ROI_MARGIN, detect_params=FACE_DETECT_PARAMS):
+        self.cascade = cascade
+        self.detect_every = max(1, detect_every)
+        self.detect_width = detect_width
+        self.roi_margin = roi_margin
+        self.scale_factor = detect_params.get('scaleFactor', 1.1)
+        self.min_neighbors = detect_params.get('minNeighbors', 5)
+        self.min_size = detect_params.get('minSize', (30, 30))
+        self.boxes = []
+        self.since_detect = 0
+        self.full_detections = 0
+        self.roi_searches = 0
+        self.lost = 0
+
+    def locate(self, gray):
+        if not self.boxes or self.since_detect >= self.detect_every - 1:
+            self.boxes = self._detect(gray)
+            self.since_detect = 0
+        else:
+            tracked = self._track(gray)
+            if len(tracked) < len(self.boxes):
+                # A face moved out of its window: look over the whole frame again
+                tracked = self._detect(gray)
+                self.since_detect = 0
+            else:
+                self.since_detect += 1
+            self.boxes = tracked
+        return self.boxes
+
+    def reset(self):
+        self.boxes = []
+
+    def _detect(self, gray):
+        self.full_detections += 1
+        height, width = gray.shape[:2]
+        scale = min(1.0, self.detect_width / width) if self.detect_width else 1.0
+        small = cv2.resize(gray, (round(width * scale), round(height * scale)), interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+        min_size = tuple(max(HAAR_WINDOW, round(side * scale)) for side in self.min_size)
+        faces = self.cascade.detectMultiScale(small, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors, minSize=min_size)
+        return [tuple(round(v / scale) for v in face) for face in faces]
+
+    def _track(self, gray):
+        height, width = gray.shape[:2]
+        tracked = []
+        for (x, y, w, h) in self.boxes:
+            self.roi_searches += 1
+            mx, my = int(w * self.roi_margin), int(h * self.roi_margin)
+            x0, y0 = max(0, x - mx), max(0, y - my)
+            x1, y1 = min(width, x + w + mx), min(height, y + h + my)
+            faces = self.cascade.detectMultiScale(
+                gray[y0:y1, x0:x1], scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+                minSize=(max(self.min_size[0], int(w * 0.7)), max(self.min_size[1], int(h * 0.7))),
+                maxSize=(int(w * 1.4) + 1, int(h * 1.4) + 1)
+            )
+            if len(faces) == 0:
+                self.lost += 1
+                continue
+            # The candidate closest to the previous box centre
+            cx, cy = x + w / 2 - x0, y + h / 2 - y0
+            fx, fy, fw, fh = min(faces, key=lambda f: (f[0] + f[2] / 2 - cx) ** 2 + (f[1] + f[3] / 2 - cy) ** 2)
+            tracked.append((int(fx) + x0, int(fy) + y0, int(fw), int(fh)))
+        return tracked
+
+    def stats(self):
+        return {
+            "full_detections": self.full_detections,
+            "roi_searches": self.roi_searches,
+            "lost": self.lost,
+            "detect_every": self.detect_every,
+            "detect_width": self.detect_width,
+        }
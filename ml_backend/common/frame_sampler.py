@@ -0,0 +1,71 @@
+import cv2
+
+# Source fps assumed when the container does not report one
+FALLBACK_FPS = 30.0
+# Frames between samples above which seeking beats grabbing every frame
+SEEK_MIN_STEP = 45
+
+# Yields (timestamp_seconds, frame) for roughly target_fps analysed frames per
+# second of video, independent of the source fps. Skipped frames are only
+# grabbed (demuxed, not converted); sparse rates seek by timestamp instead.
+class FrameSampler:
+    def __init__(self, cap, target_fps, seek_min_step=SEEK_MIN_STEP):
+        self.cap = cap
+        self.target_fps = float(target_fps)
+        source_fps = cap.get(cv2.CAP_PROP_FPS)
+        self.source_fps = source_fps if source_fps and source_fps > 0 else FALLBACK_FPS
+        self.step = max(1.0, self.source_fps / self.target_fps)
+        self.mode = "seek" if self.step >= seek_min_step else "grab"
+        self.grabbed_frames = 0
+        self.processed_frames = 0
+        self.duration = 0.0
+
+    def __iter__(self):
+        return self._seek() if self.mode == "seek" else self._grab()
+
+    def _grab(self):
+        next_sample = 0.0
+        while self.cap.grab():
+            index = self.grabbed_frames
+            self.grabbed_frames += 1
+            self.duration = self.grabbed_frames / self.source_fps
+            if index + 1e-6 < next_sample:
+                continue
+            next_sample += self.step
+            ret, frame = self.cap.retrieve()
+            if not ret:
+                continue
+            self.processed_frames += 1
+            yield index / self.source_fps, frame
+
+    def _seek(self):
+        frame_count = self.cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        end = frame_count / self.source_fps if frame_count and frame_count > 0 else None
+        interval = 1.0 / self.target_fps
+        timestamp = 0.0
+        while end is None or timestamp < end:
+            self.cap.set(cv2.CAP_PROP_POS_MSEC, timestamp * 1000)
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            self.processed_frames += 1
+            self.grabbed_frames += 1
+            self.duration = max(self.duration, timestamp)
+            yield timestamp, frame
+            timestamp += interval
+        if end is not None:
+            self.duration = end
+
+    def stats(self, elapsed=None):
+        stats = {
+            "mode": self.mode,
+            "target_fps": round(self.target_fps, 3),
+            "source_fps": round(self.source_fps, 3),
+            "processed_frames": self.processed_frames,
+            "video_seconds": round(self.duration, 2),
+            "sampled_fps": round(self.processed_frames / self.duration, 3) if self.duration else 0,
+        }
+        if elapsed is not None:
+            stats["analysis_seconds"] = round(elapsed, 3)
+            stats["processed_frames_per_sec"] = round(self.processed_frames / elapsed, 2) if elapsed > 0 else 0
+        return stats
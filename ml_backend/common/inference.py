@@ -0,0 +1,308 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+logger = logging.getLogger(__name__)
+
+# Which engine runs the emotion CNN, and the model file it reads: "keras"
+# loads the .h5 with TensorFlow, "numpy" runs the weights exported by
+# tools/export_emotion_model.py without TensorFlow, "int8" runs the
+# post-training quantized TFLite model from tools/quantize_emotion_model.py
+EMOTION_BACKEND = os.environ.get('EMOTION_BACKEND', 'keras')
+EMOTION_MODEL_PATHS = {
+    'keras': os.environ.get('EMOTION_MODEL', './emotion_classifier.h5'),
+    'numpy': os.environ.get('EMOTION_NUMPY_MODEL', './emotion_classifier.npz'),
+    'int8': os.environ.get('EMOTION_INT8_MODEL', './emotion_classifier_int8.tflite'),
+}
+
+# The int8 model is only used once tools/evaluate_int8_model.py has written a
+# report for that exact file with label agreement of at least this much
+INT8_MIN_AGREEMENT = float(os.environ.get('EMOTION_INT8_MIN_AGREEMENT', 0.98))
+INT8_THREADS = int(os.environ.get('EMOTION_INT8_THREADS', 2))
+
+
+class QuantizationGateError(Exception):
+    pass
+
+# Patch size (kernel taps * input channels) up to which a convolution is
+# one im2col matmul rather than a sum over kernel taps
+IM2COL_MAX_PATCH = 64
+
+# Layers with no effect at inference time
+_IDENTITY_LAYERS = {'InputLayer', 'Dropout', 'SpatialDropout2D', 'GaussianNoise', 'GaussianDropout', 'ActivityRegularization'}
+
+
+# Every backend takes a float32 batch shaped (n, 48, 48, 1) and returns an
+# (n, classes) array of probabilities
+class KerasBackend:
+    name = 'keras'
+
+    def __init__(self, path):
+        from keras.models import load_model
+        self.model = load_model(path, compile=False)
+
+    def predict_on_batch(self, batch):
+        return np.asarray(self.model.predict_on_batch(batch))
+
+
+# Forward pass of a sequential CNN in plain NumPy. Batch normalisation is
+# folded into a per-channel scale and shift when the model is exported.
+class NumpyBackend:
+    name = 'numpy'
+
+    def __init__(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            self.layers = json.loads(str(data['spec']))
+            self.weights = {key: data[key].astype(np.float32) for key in data.files if key != 'spec'}
+
+    def predict_on_batch(self, batch):
+        x = np.asarray(batch, dtype=np.float32)
+        for i, layer in enumerate(self.layers):
+            x = _LAYER_OPS[layer['type']](x, layer, lambda name: self.weights[f"{i}_{name}"])
+        return x
+
+
+# Quantized model run by the TFLite interpreter (LiteRT, tflite_runtime or
+# TensorFlow, whichever is installed). Inputs and outputs stay float32; the
+# interpreter is resized to each batch size and is not thread-safe, hence the lock.
+class Int8Backend:
+    name = 'int8'
+
+    def __init__(self, path, gated=True):
+        if gated:
+            check_quantization_report(path)
+        self.interpreter = _tflite_interpreter(path)
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.batch_size = None
+        self.lock = threading.Lock()
+
+    def predict_on_batch(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self.lock:
+            if len(batch) != self.batch_size:
+                self.interpreter.resize_tensor_input(self.input_index, batch.shape)
+                self.interpreter.allocate_tensors()
+                self.batch_size = len(batch)
+            self.interpreter.set_tensor(self.input_index, batch)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index).copy()
+
+
+def _tflite_interpreter(path):
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    return Interpreter(model_path=path, num_threads=INT8_THREADS)
+
+
+BACKENDS = {
+    'keras': KerasBackend,
+    'numpy': NumpyBackend,
+    'int8': Int8Backend,
+}
+
+
+# Build the configured emotion backend. An int8 model without a passing
+# evaluation report is refused and the float Keras model is used instead.
+def load_emotion_backend(name=None, path=None):
+    name = name or EMOTION_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown emotion backend {name!r}; expected one of {', '.join(BACKENDS)}")
+    try:
+        backend = BACKENDS[name](path or EMOTION_MODEL_PATHS[name])
+    except QuantizationGateError as e:
+        logger.error(f"Not using the int8 emotion model: {e}; falling back to keras")
+        return load_emotion_backend('keras')
+    logger.info(f"Emotion model loaded with the {name} backend")
+    return backend
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def quantization_report_path(model_path):
+    return model_path + '.report.json'
+
+
+# Raise QuantizationGateError unless the model's evaluation report matches
+# the file and its worst per-service label agreement meets INT8_MIN_AGREEMENT
+def check_quantization_report(model_path, min_agreement=None):
+    min_agreement = INT8_MIN_AGREEMENT if min_agreement is None else min_agreement
+    report_path = quantization_report_path(model_path)
+    try:
+        with open(report_path) as f:
+            report = json.load(f)
+    except FileNotFoundError:
+        raise QuantizationGateError(f"no evaluation report at {report_path} (run tools/evaluate_int8_model.py)")
+    if report.get('model_sha256') != file_sha256(model_path):
+        raise QuantizationGateError(f"{report_path} was written for a different model file")
+    agreement = min(report['agreement'].values())
+    if agreement < min_agreement:
+        raise QuantizationGateError(f"label agreement {agreement:.3f} is below {min_agreement:.3f}")
+    return report
+
+
+# Post-training int8 quantization of a Keras model. `calibration` is a
+# (n, 48, 48, 1) float batch of real face crops used to pick activation ranges.
+def export_int8_model(model, calibration, path):
+    import tensorflow as tf
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = lambda: ([face[np.newaxis]] for face in calibration)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    return os.path.getsize(path)
+
+
+# Export a loaded Keras model's layers and weights to the .npz read by NumpyBackend
+def export_numpy_model(model, path):
+    spec = []
+    arrays = {}
+    for layer in model.layers:
+        kind = type(layer).__name__
+        config = layer.get_config()
+        weights = layer.get_weights()
+        entry = {'type': kind}
+        params = {}
+        if kind in ('Conv2D', 'Dense'):
+            if kind == 'Conv2D' and tuple(config['dilation_rate']) != (1, 1):
+                raise ValueError(f"{layer.name}: dilated convolutions are not supported")
+            if config.get('data_format', 'channels_last') != 'channels_last':
+                raise ValueError(f"{layer.name}: only channels_last is supported")
+            params['kernel'] = weights[0]
+            params['bias'] = weights[1] if config['use_bias'] else np.zeros(weights[0].shape[-1])
+            entry['activation'] = config['activation']
+            if kind == 'Conv2D':
+                entry['strides'] = list(config['strides'])
+                entry['padding'] = config['padding']
+        elif kind == 'BatchNormalization':
+            names = (['gamma'] if config['scale'] else []) + (['beta'] if config['center'] else []) + ['moving_mean', 'moving_variance']
+            values = dict(zip(names, weights))
+            scale = values.get('gamma', 1.0) / np.sqrt(values['moving_variance'] + config['epsilon'])
+            params['scale'] = scale
+            params['shift'] = values.get('beta', 0.0) - values['moving_mean'] * scale
+        elif kind in ('MaxPooling2D', 'AveragePooling2D'):
+            entry['pool_size'] = list(config['pool_size'])
+            entry['strides'] = list(config['strides'] or config['pool_size'])
+            entry['padding'] = config['padding']
+        elif kind == 'Activation':
+            entry['activation'] = config['activation']
+        elif kind == 'ReLU':
+            if config.get('max_value') is not None or config.get('negative_slope'):
+                raise ValueError(f"{layer.name}: only plain ReLU is supported")
+            entry = {'type': 'Activation', 'activation': 'relu'}
+        elif kind == 'Softmax':
+            entry = {'type': 'Activation', 'activation': 'softmax'}
+        elif kind not in _LAYER_OPS:
+            raise ValueError(f"{layer.name}: layer type {kind} is not supported by the numpy backend")
+        for name, value in params.items():
+            arrays[f"{len(spec)}_{name}"] = np.asarray(value, np.float32)
+        spec.append(entry)
+    np.savez(path, spec=np.array(json.dumps(spec)), **arrays)
+    return spec
+
+
+def _activate(x, name):
+    if name == 'linear':
+        return x
+    if name == 'relu':
+        return np.maximum(x, 0)
+    if name == 'softmax':
+        e = np.exp(x - x.max(axis=-1, keepdims=True))
+        return e / e.sum(axis=-1, keepdims=True)
+    if name == 'sigmoid':
+        return 1.0 / (1.0 + np.exp(-x))
+    if name == 'tanh':
+        return np.tanh(x)
+    if name == 'elu':
+        return np.where(x > 0, x, np.expm1(np.minimum(x, 0)))
+    raise ValueError(f"Unsupported activation {name!r}")
+
+
+# TensorFlow's "same" padding: extra rows/columns go after, not before
+def _pad_amounts(size, window, stride, padding):
+    if padding == 'valid':
+        return 0, 0
+    out = -(-size // stride)
+    total = max((out - 1) * stride + window - size, 0)
+    return total // 2, total - total // 2
+
+
+def _windows(x, window, strides, padding, fill=0.0):
+    (kh, kw), (sh, sw) = window, strides
+    top, bottom = _pad_amounts(x.shape[1], kh, sh, padding)
+    left, right = _pad_amounts(x.shape[2], kw, sw, padding)
+    if top or bottom or left or right:
+        x = np.pad(x, ((0, 0), (top, bottom), (left, right), (0, 0)), constant_values=fill)
+    # (n, out_h, out_w, channels, kh, kw)
+    return sliding_window_view(x, (kh, kw), axis=(1, 2))[:, ::sh, ::sw]
+
+
+# Sum of one (n*h*w, in) @ (in, out) product per kernel tap over shifted
+# views of the padded input, avoiding a full im2col copy for wide layers
+def _conv2d(x, layer, weight):
+    kernel = weight('kernel')
+    (kh, kw, _, filters), (sh, sw) = kernel.shape, layer['strides']
+    top, bottom = _pad_amounts(x.shape[1], kh, sh, layer['padding'])
+    left, right = _pad_amounts(x.shape[2], kw, sw, layer['padding'])
+    if top or bottom or left or right:
+        x = np.pad(x, ((0, 0), (top, bottom), (left, right), (0, 0)))
+    out_h = (x.shape[1] - kh) // sh + 1
+    out_w = (x.shape[2] - kw) // sw + 1
+    taps = [x[:, i:i + (out_h - 1) * sh + 1:sh, j:j + (out_w - 1) * sw + 1:sw, :] for i in range(kh) for j in range(kw)]
+    if x.shape[3] * len(taps) <= IM2COL_MAX_PATCH:
+        # Few input channels (the grayscale first layer): one matmul over stacked patches
+        out = np.concatenate(taps, axis=3) @ kernel.reshape(-1, filters)
+    else:
+        out = np.zeros((x.shape[0], out_h, out_w, filters), np.float32)
+        for tap, weights in zip(taps, kernel.reshape(-1, x.shape[3], filters)):
+            out += tap @ weights
+    out += weight('bias')
+    return _activate(out, layer['activation'])
+
+
+def _dense(x, layer, weight):
+    return _activate(x @ weight('kernel') + weight('bias'), layer['activation'])
+
+
+def _max_pool(x, layer, weight):
+    return _windows(x, layer['pool_size'], layer['strides'], layer['padding'], fill=-np.inf).max(axis=(4, 5))
+
+
+def _average_pool(x, layer, weight):
+    total = _windows(x, layer['pool_size'], layer['strides'], layer['padding']).sum(axis=(4, 5))
+    # Padded cells are not counted, as in TensorFlow
+    ones = np.ones((1,) + x.shape[1:3] + (1,), np.float32)
+    counts = _windows(ones, layer['pool_size'], layer['strides'], layer['padding']).sum(axis=(4, 5))
+    return total / counts
+
+
+_LAYER_OPS = {
+    'Conv2D': _conv2d,
+    'Dense': _dense,
+    'BatchNormalization': lambda x, layer, weight: x * weight('scale') + weight('shift'),
+    'MaxPooling2D': _max_pool,
+    'AveragePooling2D': _average_pool,
+    'GlobalAveragePooling2D': lambda x, layer, weight: x.mean(axis=(1, 2)),
+    'GlobalMaxPooling2D': lambda x, layer, weight: x.max(axis=(1, 2)),
+    'Flatten': lambda x, layer, weight: x.reshape(len(x), -1),
+    'Activation': lambda x, layer, weight: _activate(x, layer['activation']),
+}
+_LAYER_OPS.update({kind: (lambda x, layer, weight: x) for kind in _IDENTITY_LAYERS})
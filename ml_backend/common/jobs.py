@@ -0,0 +1,102 @@
+import logging
+import queue
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+# In-process job queue served by a fixed pool of worker threads. Job functions
+# follow the services' (result, status_code) return convention; finished jobs
+# are kept for result_ttl seconds and then dropped.
+class JobQueue:
+    def __init__(self, workers=2, result_ttl=3600, max_pending=100, name='jobs'):
+        self.result_ttl = result_ttl
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.threads = []
+        for i in range(max(1, workers)):
+            thread = threading.Thread(target=self._worker, name=f"{name}-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, owner, func, *args, on_done=None, **kwargs):
+        self._expire()
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "owner": owner,
+            "status": "queued",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "status_code": None,
+            "error": None,
+        }
+        with self.lock:
+            self.jobs[job_id] = job
+        try:
+            self.pending.put_nowait((job, func, args, kwargs, on_done))
+        except queue.Full:
+            with self.lock:
+                del self.jobs[job_id]
+            raise QueueFullError("Too many queued jobs")
+        logger.info(f"Queued job {job_id}")
+        return job_id
+
+    def get(self, job_id):
+        self._expire()
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        with self.lock:
+            states = [job["status"] for job in self.jobs.values()]
+        return {
+            "workers": len(self.threads),
+            "queued": states.count("queued"),
+            "running": states.count("running"),
+            "finished": states.count("finished"),
+            "failed": states.count("failed"),
+        }
+
+    def _worker(self):
+        while True:
+            job, func, args, kwargs, on_done = self.pending.get()
+            with self.lock:
+                job.update(status="running", started_at=time.time())
+            # Readers copy the job under self.lock, so the outcome is published
+            # in one locked update and never seen half-written
+            outcome = {"error": None}
+            try:
+                result, status_code = func(*args, **kwargs)
+                outcome.update(result=result, status_code=status_code, status="finished" if status_code == 200 else "failed")
+                if status_code != 200 and isinstance(result, dict):
+                    outcome["error"] = result.get("error")
+            except Exception as e:
+                logger.error(f"Job {job['id']} failed: {e}")
+                outcome.update(status_code=500, status="failed", error=str(e))
+            finally:
+                with self.lock:
+                    job.update(outcome, finished_at=time.time())
+                if on_done:
+                    try:
+                        on_done()
+                    except Exception as e:
+                        logger.warning(f"Job {job['id']} cleanup failed: {e}")
+                self.pending.task_done()
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        with self.lock:
+            expired = [job_id for job_id, job in self.jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]
+            for job_id in expired:
+                del self.jobs[job_id]
@@ -0,0 +1,350 @@
+import logging
+import threading
+import time
+import wave
+from collections import deque
+
+import numpy as np
+import speech_recognition as sr
+
+from common.audio import SAMPLE_RATE, SAMPLE_WIDTH, to_audio_data
+from common.segmenter import FRAME_MS, MIN_ENERGY, recognize_google
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SAMPLES = 1024  # samples per read from a source (64 ms at 16 kHz)
+RING_SECONDS = 30  # audio kept behind the capture position
+# A frame is voiced when its RMS exceeds the noise floor by SPEECH_RATIO (and
+# MIN_ENERGY); the floor is measured over the first CALIBRATION_MS, like
+# adjust_for_ambient_noise, then follows unvoiced frames
+SPEECH_RATIO = 3.0
+CALIBRATION_MS = 1000
+NOISE_ADAPT = 0.05
+HANGOVER_MS = 600  # silence that ends an utterance
+MIN_SPEECH_MS = 250  # utterances with less voiced audio are dropped as clicks
+PRE_ROLL_MS = 300  # audio kept before the first voiced frame
+MAX_UTTERANCE_SECONDS = 15  # longer speech is cut, like phrase_time_limit
+MAX_PENDING = 8  # utterances waiting for recognition before new ones are skipped
+
+
+# Audio sources are context managers; read() returns the next int16 mono chunk,
+# or None once the source is exhausted. `sample_rate` is set on construction.
+class MicrophoneSource:
+    def __init__(self, sample_rate=SAMPLE_RATE, chunk=CHUNK_SAMPLES, device_index=None):
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.microphone = sr.Microphone(device_index=device_index, sample_rate=sample_rate, chunk_size=chunk)
+        self.stream = None
+
+    def __enter__(self):
+        self.stream = self.microphone.__enter__().stream
+        return self
+
+    def __exit__(self, *exc_info):
+        self.microphone.__exit__(*exc_info)
+        self.stream = None
+
+    def read(self):
+        return np.frombuffer(self.stream.read(self.chunk), dtype=np.int16)
+
+
+# Plays back samples held in memory; speed=1 paces reads like a live device,
+# speed=N runs N times faster and speed=0 as fast as the reader consumes them
+class ArraySource:
+    def __init__(self, samples, sample_rate=SAMPLE_RATE, chunk=CHUNK_SAMPLES, speed=1.0):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.speed = speed
+        self.position = 0
+        self.started_at = None
+
+    def __enter__(self):
+        self.position = 0
+        self.started_at = time.monotonic()
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def read(self):
+        if self.position >= len(self.samples):
+            return None
+        chunk = self.samples[self.position:self.position + self.chunk]
+        self.position += len(chunk)
+        if self.speed:
+            delay = self.started_at + self.position / self.sample_rate / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return chunk
+
+
+# 16-bit PCM WAV file; several channels are mixed down to mono
+class WavFileSource(ArraySource):
+    def __init__(self, path, chunk=CHUNK_SAMPLES, speed=1.0):
+        with wave.open(path, 'rb') as wav:
+            if wav.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError(f"{path}: expected 16-bit PCM, got {wav.getsampwidth() * 8}-bit")
+            channels = wav.getnchannels()
+            sample_rate = wav.getframerate()
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        super().__init__(samples, sample_rate, chunk, speed)
+
+
+# Noise bursts of 1-6 s separated by 0.4-2 s pauses, roughly like speech with
+# breaths; `bursts` holds the (start, end) seconds of each burst
+class SyntheticSource(ArraySource):
+    def __init__(self, seconds=60, seed=0, sample_rate=SAMPLE_RATE, chunk=CHUNK_SAMPLES, speed=1.0):
+        rng = np.random.default_rng(seed)
+        parts = [rng.normal(0, 30, sample_rate)]  # a quiet second to calibrate on
+        total = len(parts[0])
+        self.bursts = []
+        while total < seconds * sample_rate:
+            speech = rng.normal(0, 3000, int(sample_rate * rng.uniform(1, 6)))
+            pause = rng.normal(0, 30, int(sample_rate * rng.uniform(0.4, 2)))
+            self.bursts.append((total / sample_rate, (total + len(speech)) / sample_rate))
+            parts += [speech, pause]
+            total += len(speech) + len(pause)
+        samples = np.clip(np.concatenate(parts), -32768, 32767).astype(np.int16)
+        super().__init__(samples, sample_rate, chunk, speed)
+
+
+# 'microphone', 'synthetic[:SECONDS]' or the path of a WAV file
+def open_audio_source(spec, speed=1.0):
+    if spec == 'microphone':
+        return MicrophoneSource()
+    if spec.startswith('synthetic'):
+        _, _, seconds = spec.partition(':')
+        return SyntheticSource(float(seconds or 60), speed=speed)
+    return WavFileSource(spec, speed=speed)
+
+
+# An audio source opened as a SharedDevice device, so several sessions can
+# listen to the one microphone
+class AudioDevice:
+    def __init__(self, spec, speed=1.0):
+        self.source = open_audio_source(spec, speed)
+        self.sample_rate = self.source.sample_rate
+        self.source.__enter__()
+
+    def read(self):
+        return self.source.read()
+
+    def close(self):
+        self.source.__exit__(None, None, None)
+
+
+# LiveTranscriber source reading one subscription of a SharedDevice of
+# AudioDevice; subscribes (opening the device if needed) on construction
+class SharedAudioSource:
+    def __init__(self, shared):
+        self.subscription = shared.subscribe()
+        self.sample_rate = self.subscription.device.sample_rate
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.subscription.close()
+
+    def read(self):
+        return self.subscription.read()
+
+
+# Fixed-size int16 ring addressed by absolute sample positions; positions
+# older than `capacity` samples behind the write position are gone. Written
+# and read by the capture loop only.
+class AudioRingBuffer:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buffer = np.zeros(capacity, dtype=np.int16)
+        self.written = 0
+
+    def write(self, samples):
+        if len(samples) > self.capacity:
+            self.written += len(samples) - self.capacity
+            samples = samples[-self.capacity:]
+        start = self.written % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self.buffer[start:start + first] = samples[:first]
+        self.buffer[:len(samples) - first] = samples[first:]
+        self.written += len(samples)
+
+    def read(self, start, end):
+        start = max(start, self.written - self.capacity)
+        end = min(end, self.written)
+        if start >= end:
+            return np.zeros(0, dtype=np.int16)
+        first, last = start % self.capacity, end % self.capacity
+        if first < last:
+            return self.buffer[first:last].copy()
+        return np.concatenate([self.buffer[first:], self.buffer[:last]])
+
+
+# Streaming energy voice activity detection over FRAME_MS frames. update()
+# takes one frame's RMS and returns (first_frame, end_frame) when an
+# utterance ends: after HANGOVER_MS of silence or MAX_UTTERANCE_SECONDS.
+class EnergyVAD:
+    def __init__(self, sample_rate=SAMPLE_RATE, speech_ratio=SPEECH_RATIO, hangover_ms=HANGOVER_MS,
+                 max_utterance_seconds=MAX_UTTERANCE_SECONDS):
+        self.frame_len = int(sample_rate * FRAME_MS / 1000)
+        self.speech_ratio = speech_ratio
+        self.calibration = CALIBRATION_MS // FRAME_MS
+        self.hangover = max(1, hangover_ms // FRAME_MS)
+        self.min_speech = MIN_SPEECH_MS // FRAME_MS
+        self.pre_roll = PRE_ROLL_MS // FRAME_MS
+        self.max_frames = int(max_utterance_seconds * 1000 / FRAME_MS)
+        self.noise_floor = 0.0
+        self.frames = 0
+        self.start = None
+        self.voiced = 0
+        self.silent = 0
+
+    def threshold(self):
+        return max(MIN_ENERGY, self.noise_floor * self.speech_ratio)
+
+    def update(self, energy):
+        index = self.frames
+        self.frames += 1
+        if index < self.calibration:
+            self.noise_floor += (energy - self.noise_floor) / (index + 1)
+            return None
+        voiced = energy > self.threshold()
+        if not voiced:
+            self.noise_floor += NOISE_ADAPT * (energy - self.noise_floor)
+        if self.start is None:
+            if voiced:
+                self.start, self.voiced, self.silent = index, 1, 0
+            return None
+        if voiced:
+            self.voiced += 1
+            self.silent = 0
+        else:
+            self.silent += 1
+        if self.silent >= self.hangover or self.frames - self.start >= self.max_frames:
+            return self._finish()
+        return None
+
+    # The utterance still open when the audio ends, if any
+    def flush(self):
+        return self._finish() if self.start is not None else None
+
+    def _finish(self):
+        start, voiced = self.start, self.voiced
+        self.start = None
+        if voiced < self.min_speech:
+            return None
+        return max(0, start - self.pre_roll), self.frames
+
+
+# Continuous speech capture: one open source feeds a ring buffer, the VAD cuts
+# utterances out of it and `recognize(sr.AudioData) -> text` runs on
+# `executor`, so reading never waits for recognition. on_text / on_error are
+# called in utterance order from whichever thread finishes the oldest one.
+class LiveTranscriber:
+    def __init__(self, source, executor, recognize=recognize_google, on_text=None, on_error=None,
+                 running=lambda: True, ring_seconds=RING_SECONDS, vad=None, max_pending=MAX_PENDING, name='live-audio'):
+        self.source = source
+        self.executor = executor
+        self.recognize = recognize
+        self.on_text = on_text or (lambda text: None)
+        self.on_error = on_error or (lambda error: None)
+        self.running = running
+        self.ring_seconds = ring_seconds
+        self.vad = vad or EnergyVAD(source.sample_rate)
+        self.max_pending = max_pending
+        self.name = name
+        self.pending = deque()
+        self.lock = threading.Lock()
+        self.deliver_lock = threading.Lock()
+        self.counts = {"utterances": 0, "recognized": 0, "failed": 0, "skipped": 0}
+        self.captured = 0
+        self.lags = deque(maxlen=100)
+
+    # Capture loop; returns when `running()` turns false or the source ends
+    def run(self):
+        frame_len = self.vad.frame_len
+        with self.source as source:
+            ring = AudioRingBuffer(int(self.ring_seconds * source.sample_rate))
+            analysed = 0
+            logger.info(f"{self.name}: listening")
+            while self.running():
+                chunk = source.read()
+                if chunk is None:
+                    break
+                ring.write(chunk)
+                self.captured += len(chunk)
+                while ring.written - analysed >= frame_len:
+                    frame = ring.read(analysed, analysed + frame_len).astype(np.float32)
+                    analysed += frame_len
+                    utterance = self.vad.update(float(np.sqrt(np.mean(frame * frame))))
+                    if utterance:
+                        self._submit(ring, utterance, source.sample_rate)
+            utterance = self.vad.flush()
+            if utterance:
+                self._submit(ring, utterance, source.sample_rate)
+        logger.info(f"{self.name}: stopped listening")
+
+    def _submit(self, ring, utterance, sample_rate):
+        first, end = (frame * self.vad.frame_len for frame in utterance)
+        with self.lock:
+            self.counts["utterances"] += 1
+            if len(self.pending) >= self.max_pending:
+                self.counts["skipped"] += 1
+                logger.warning(f"{self.name}: recognition backlog full, skipping {(end - first) / sample_rate:.1f}s utterance")
+                return
+        audio = to_audio_data(ring.read(first, end), sample_rate)
+        future = self.executor.submit(self.recognize, audio)
+        with self.lock:
+            self.pending.append((time.monotonic(), future))
+        future.add_done_callback(lambda _: self._deliver())
+
+    def _deliver(self):
+        with self.deliver_lock:
+            while True:
+                with self.lock:
+                    if not self.pending or not self.pending[0][1].done():
+                        return
+                    submitted_at, future = self.pending.popleft()
+                    self.lags.append(time.monotonic() - submitted_at)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    self._count("failed")
+                    self.on_error(e)
+                    continue
+                self._count("recognized")
+                self.on_text(text)
+
+    def _count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    # Wait up to `timeout` seconds for queued utterances to be delivered
+    def drain(self, timeout=None):
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            with self.lock:
+                if not self.pending:
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.counts)
+            pending = len(self.pending)
+            lags = sorted(self.lags)
+        return dict(
+            counts,
+            pending=pending,
+            captured_seconds=round(self.captured / self.source.sample_rate, 1),
+            noise_floor=round(self.vad.noise_floor, 1),
+            lag_ms={
+                "avg": round(sum(lags) / len(lags) * 1000, 1) if lags else None,
+                "p95": round(lags[int(len(lags) * 0.95)] * 1000, 1) if lags else None,
+            },
+        )
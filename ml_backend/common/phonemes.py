@@ -0,0 +1,86 @@
+import logging
+import mmap
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'cmudict_phonemes.idx')
+
+# File layout (little-endian):
+#   magic (8 bytes) | word count N (uint32) | blob size (uint32)
+#   offsets: uint32[N + 1] into the blob | counts: uint8[N] | blob: sorted UTF-8 words
+_MAGIC = b'CMUPHN1\0'
+_HEADER = struct.Struct('<8sII')
+
+
+# Write a phoneme-count index for {word: phoneme_count}
+def build_index(phoneme_counts, path):
+    words = sorted((word.lower().encode('utf-8'), min(count, 255)) for word, count in phoneme_counts.items())
+    offsets = [0]
+    for word, _ in words:
+        offsets.append(offsets[-1] + len(word))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, len(words), offsets[-1]))
+        f.write(struct.pack(f'<{len(offsets)}I', *offsets))
+        f.write(bytes(count for _, count in words))
+        f.write(b''.join(word for word, _ in words))
+    os.replace(tmp_path, path)
+    return len(words)
+
+
+# Compile NLTK's CMUdict (first pronunciation of each word) into an index
+def build_from_cmudict(path=DEFAULT_INDEX_PATH):
+    from nltk.corpus import cmudict
+    from common.startup import use_local_nltk_data
+    if use_local_nltk_data(('cmudict',)):
+        raise LookupError("CMUdict not provisioned; run tools/provision_nltk_data.py --resource cmudict")
+    entries = {}
+    for word, phonemes in cmudict.entries():
+        entries.setdefault(word, len(phonemes))
+    return build_index(entries, path)
+
+
+# Read-only, memory-mapped phoneme-count lookup. The file's pages are shared
+# by every process that maps it, and opening it costs no parsing.
+class PhonemeIndex:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, blob_size = _HEADER.unpack_from(self.map, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a phoneme index")
+        view = memoryview(self.map)
+        start = _HEADER.size
+        self.offsets = view[start:start + 4 * (self.size + 1)].cast('I')
+        start += 4 * (self.size + 1)
+        self.counts = view[start:start + self.size]
+        self.blob_start = start + self.size
+
+    def _word(self, i):
+        return self.map[self.blob_start + self.offsets[i]:self.blob_start + self.offsets[i + 1]]
+
+    # Phonemes in the word's first pronunciation, 0 when the word is unknown
+    def phoneme_count(self, word):
+        key = word.lower().encode('utf-8')
+        low, high = 0, self.size
+        while low < high:
+            mid = (low + high) // 2
+            if self._word(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.size and self._word(low) == key:
+            return self.counts[low]
+        return 0
+
+
+# Open the index, compiling it from the provisioned CMUdict first if it has not been built
+def load_phoneme_index(path=None):
+    path = path or os.environ.get('PHONEME_INDEX', DEFAULT_INDEX_PATH)
+    if not os.path.exists(path):
+        logger.warning(f"Phoneme index {path} missing; building it from CMUdict (run tools/build_phoneme_index.py at deploy time)")
+        build_from_cmudict(path)
+    return PhonemeIndex(path)
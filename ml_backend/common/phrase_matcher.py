@@ -0,0 +1,96 @@
+import json
+import re
+from collections import Counter, deque
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+# Lowercase word tokens; apostrophes stay inside words ("i'm", "don't")
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+# Result of one matching pass over a text
+class PhraseMatches:
+    __slots__ = ('tokens', 'matches')
+
+    def __init__(self, tokens, matches):
+        self.tokens = tokens
+        self.matches = matches  # (category, phrase, start_token) in text order
+
+    def counts(self):
+        return Counter(category for category, _, _ in self.matches)
+
+    def phrases(self, category):
+        seen = {}
+        for match_category, phrase, _ in self.matches:
+            if match_category == category:
+                seen.setdefault(phrase, None)
+        return list(seen)
+
+    def positions(self, category):
+        return [(phrase, start) for match_category, phrase, start in self.matches if match_category == category]
+
+
+# Aho-Corasick automaton over word tokens: every phrase of every category is
+# found in one left-to-right pass, and only on whole-word boundaries, so "may"
+# does not match inside "mayor". Overlapping phrases ("might", "might be") are
+# all reported, as they were with substring search.
+class PhraseMatcher:
+    def __init__(self, phrases_by_category):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for category, phrases in phrases_by_category.items():
+            for phrase in dict.fromkeys(phrases):
+                words = tokenize(phrase)
+                if words:
+                    self._add(words, (category, phrase, len(words)))
+        self._build_links()
+
+    # Load {"category": ["phrase", ...], ...} from a JSON file
+    @classmethod
+    def from_config(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def _add(self, words, entry):
+        node = 0
+        for word in words:
+            child = self.goto[node].get(word)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][word] = child
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = child
+        self.output[node].append(entry)
+
+    def _build_links(self):
+        pending = deque(self.goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for word, child in self.goto[node].items():
+                pending.append(child)
+                state = self.fail[node]
+                while state and word not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(word, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def match_tokens(self, tokens):
+        goto, fail, output = self.goto, self.fail, self.output
+        matches = []
+        node = 0
+        for i, token in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for category, phrase, length in output[node]:
+                matches.append((category, phrase, i - length + 1))
+        matches.sort(key=lambda match: match[2])
+        return PhraseMatches(tokens, matches)
+
+    def match(self, text):
+        return self.match_tokens(tokenize(text))
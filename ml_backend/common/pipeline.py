@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 120  # frames kept for the latency percentiles
+
+
+# Bounded hand-off between two pipeline stages. When full, put() discards
+# the oldest item so the consumer always gets the freshest frames.
+class DropOldestQueue:
+    def __init__(self, maxsize=1):
+        self.items = deque(maxlen=maxsize)
+        self.cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self.cond:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+            self.items.append(item)
+            self.cond.notify()
+
+    # Next item, or None once closed or after `timeout` seconds
+    def get(self, timeout=None):
+        with self.cond:
+            if not self.items and not self.closed:
+                self.cond.wait(timeout)
+            return self.items.popleft() if self.items else None
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+# Capture -> annotate -> encode, each stage on its own thread and linked by
+# drop-oldest queues, so a slow stage skips frames instead of stalling the
+# stream or letting stale frames pile up behind it.
+#   capture() -> (ok, frame); annotate(frame) -> frame; encode(frame) -> bytes or None
+# frames() yields encoded frames until `running()` turns false or capture fails;
+# on_stop() then runs on the capture thread, e.g. to release the device.
+class FramePipeline:
+    def __init__(self, capture, annotate, encode, running=lambda: True, queue_size=1, name='pipeline', on_stop=None):
+        self.capture = capture
+        self.annotate = annotate
+        self.encode = encode
+        self.running = running
+        self.on_stop = on_stop
+        self.name = name
+        self.captured = DropOldestQueue(queue_size)
+        self.annotated = DropOldestQueue(queue_size)
+        self.encoded = DropOldestQueue(queue_size)
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.lock = threading.Lock()
+        self.counts = {"captured": 0, "annotated": 0, "encoded": 0, "delivered": 0, "errors": 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.started_at = None
+
+    def start(self):
+        self.started_at = time.monotonic()
+        for target, stage in ((self._capture_loop, 'capture'), (self._annotate_loop, 'annotate'), (self._encode_loop, 'encode')):
+            thread = threading.Thread(target=target, name=f"{self.name}-{stage}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        for queue in (self.captured, self.annotated, self.encoded):
+            queue.close()
+
+    def _active(self):
+        if self.stop_event.is_set():
+            return False
+        if not self.running():
+            self.stop()
+            return False
+        return True
+
+    def _count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    def _capture_loop(self):
+        while self._active():
+            ok, frame = self.capture()
+            if not ok:
+                logger.error(f"{self.name}: failed to capture frame")
+                break
+            self._count("captured")
+            self.captured.put((time.monotonic(), frame))
+        self.stop()
+        if self.on_stop:
+            self.on_stop()
+
+    def _annotate_loop(self):
+        while not self.stop_event.is_set():
+            item = self.captured.get(timeout=0.5)
+            if item is None:
+                continue
+            captured_at, frame = item
+            try:
+                frame = self.annotate(frame)
+            except Exception as e:
+                self._count("errors")
+                logger.error(f"{self.name}: annotate stage failed: {e}")
+                continue
+            self._count("annotated")
+            self.annotated.put((captured_at, frame))
+
+    def _encode_loop(self):
+        while not self.stop_event.is_set():
+            item = self.annotated.get(timeout=0.5)
+            if item is None:
+                continue
+            captured_at, frame = item
+            data = self.encode(frame)
+            if data is None:
+                self._count("errors")
+                continue
+            self._count("encoded")
+            self.encoded.put((captured_at, data))
+
+    def frames(self):
+        try:
+            while not self.stop_event.is_set():
+                item = self.encoded.get(timeout=0.5)
+                if item is None:
+                    continue
+                captured_at, data = item
+                with self.lock:
+                    self.counts["delivered"] += 1
+                    self.latencies.append(time.monotonic() - captured_at)
+                yield data
+        finally:
+            self.stop()
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.counts)
+            latencies = sorted(self.latencies)
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0
+        return dict(
+            counts,
+            dropped={"capture": self.captured.dropped, "annotate": self.annotated.dropped, "encode": self.encoded.dropped},
+            delivered_fps=round(counts["delivered"] / elapsed, 2) if elapsed else 0.0,
+            latency_ms={
+                "avg": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+                "p95": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+            },
+        )
@@ -0,0 +1,66 @@
+import threading
+import time
+
+import numpy as np
+
+
+# Reuses an emotion prediction while a face's 48x48 grayscale crop stays
+# close to the crop that was last sent to the model. Faces are told apart
+# by box position: a crop belongs to the cached face whose last box centre
+# is nearest and within one box width. A prediction is reused only while
+# the mean absolute pixel difference is at most `threshold` (0-255 scale)
+# and it is younger than `max_age` seconds. threshold=0 disables reuse.
+class FacePredictionCache:
+    def __init__(self, threshold=3.0, max_age=0.5):
+        self.threshold = threshold
+        self.max_age = max_age
+        self.faces = []
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self.lookups = 0
+        self.hits = 0
+
+    # (label, score) for `crop`, from the cache or from infer(crop)
+    def predict(self, crop, box, infer):
+        now = time.monotonic()
+        with self.lock:
+            self.lookups += 1
+            self.faces = [face for face in self.faces if now - face["inferred_at"] <= self.max_age]
+            face = self._nearest(box)
+            if face and self.threshold > 0:
+                diff = np.abs(crop.astype(np.int16) - face["crop"]).mean()
+                if diff <= self.threshold:
+                    self.hits += 1
+                    face["box"] = box
+                    return face["label"], face["score"]
+        label, score = infer(crop)
+        with self.lock:
+            # By identity: == on the entries would compare their crop arrays
+            self.faces = [entry for entry in self.faces if entry is not face]
+            self.faces.append({"crop": crop.astype(np.int16), "box": box, "label": label, "score": score, "inferred_at": now})
+        return label, score
+
+    def _nearest(self, box):
+        x, y, w, h = box
+        cx, cy = x + w / 2, y + h / 2
+        best, best_distance = None, None
+        for face in self.faces:
+            fx, fy, fw, fh = face["box"]
+            distance = ((fx + fw / 2 - cx) ** 2 + (fy + fh / 2 - cy) ** 2) ** 0.5
+            if distance <= max(w, fw) and (best is None or distance < best_distance):
+                best, best_distance = face, distance
+        return best
+
+    def stats(self):
+        with self.lock:
+            lookups, hits = self.lookups, self.hits
+        elapsed = time.monotonic() - self.started_at
+        inferences = lookups - hits
+        return {
+            "faces_seen": lookups,
+            "cache_hits": hits,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "inferences": inferences,
+            "inference_rate": round(inferences / elapsed, 2) if elapsed else 0.0,
+            "face_rate": round(lookups / elapsed, 2) if elapsed else 0.0,
+        }
@@ -0,0 +1,86 @@
+import base64
+from datetime import datetime
+from urllib.parse import urlencode
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+# Parsed paging / projection arguments of a /reports request
+class PageRequest:
+    def __init__(self, limit, cursor, columns):
+        self.limit = limit
+        self.cursor = cursor
+        self.columns = columns
+
+
+def encode_cursor(timestamp, row_id):
+    raw = f"{timestamp.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        timestamp, row_id = raw.split('|')
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+# Read limit, cursor and fields/exclude from the query string. The id and time
+# columns are always selected because the next cursor is built from them.
+# Without limit or cursor the request is unpaged (limit None): clients that
+# predate paging get every row, as before.
+def parse_page_request(args, columns, time_column):
+    cursor = decode_cursor(args['cursor']) if args.get('cursor') else None
+    limit = None
+    if args.get('limit') or cursor:
+        limit = args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+    selected = list(columns)
+    if args.get('fields'):
+        requested = {field.strip() for field in args['fields'].split(',') if field.strip()}
+        unknown = requested - set(columns)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        selected = [column for column in columns if column in requested or column in ('id', time_column)]
+    if args.get('exclude'):
+        excluded = {field.strip() for field in args['exclude'].split(',')} - {'id', time_column}
+        selected = [column for column in selected if column not in excluded]
+    return PageRequest(limit, cursor, selected)
+
+
+# Fetch one page of a user's rows, newest first, seeking past the cursor with
+# the (user_id, time_column) index instead of an OFFSET. Returns (rows, next_cursor).
+def fetch_page(pool, table, time_column, user_id, page):
+    sql = f"SELECT {', '.join(page.columns)} FROM {table} WHERE user_id = %s"
+    params = [user_id]
+    if page.cursor:
+        sql += f" AND ({time_column} < %s OR ({time_column} = %s AND id < %s))"
+        params += [page.cursor[0], page.cursor[0], page.cursor[1]]
+    sql += f" ORDER BY {time_column} DESC, id DESC"
+    if page.limit is not None:
+        sql += " LIMIT %s"
+        params.append(page.limit + 1)
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+    next_cursor = None
+    if page.limit is not None and len(rows) > page.limit:
+        rows = rows[:page.limit]
+        next_cursor = encode_cursor(rows[-1][time_column], rows[-1]['id'])
+    return rows, next_cursor
+
+
+# Attach the next-page cursor and an ETag; answers 304 when If-None-Match matches
+def paged_response(response, request, next_cursor):
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        query = request.args.to_dict()
+        query['cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.path}?{urlencode(query)}>; rel="next"'
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
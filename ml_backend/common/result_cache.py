@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+# Stream an uploaded file to disk while hashing it; returns the SHA-256 hex digest
+def save_and_hash(stream, file_path, max_size=None):
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, 'wb') as out:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_size and size > max_size:
+                raise UploadTooLargeError(f"Upload exceeds {max_size} bytes")
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
+
+
+# LRU cache of JSON-serialisable analysis results keyed by content hash. With
+# persist_dir set, entries are mirrored to one JSON file each and reloaded on
+# startup, so the cache survives restarts without growing past max_entries.
+class ResultCache:
+    def __init__(self, max_entries=256, persist_dir=None):
+        self.max_entries = max_entries
+        self.persist_dir = persist_dir
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+            self._load()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            evicted = []
+            while len(self.entries) > self.max_entries:
+                evicted.append(self.entries.popitem(last=False)[0])
+        if self.persist_dir:
+            self._write(key, value)
+            for old_key in evicted:
+                self._remove(old_key)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0,
+            }
+
+    def _path(self, key):
+        return os.path.join(self.persist_dir, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def _write(self, key, value):
+        path = self._path(key)
+        try:
+            with open(path + '.tmp', 'w') as f:
+                json.dump({"key": key, "value": value}, f)
+            os.replace(path + '.tmp', path)
+        except Exception as e:
+            logger.warning(f"Failed to persist cache entry: {e}")
+
+    def _remove(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _load(self):
+        files = [os.path.join(self.persist_dir, name) for name in os.listdir(self.persist_dir) if name.endswith('.json')]
+        files.sort(key=os.path.getmtime)
+        for path in files[-self.max_entries:]:
+            try:
+                with open(path) as f:
+                    entry = json.load(f)
+                self.entries[entry["key"]] = entry["value"]
+            except Exception as e:
+                logger.warning(f"Skipping unreadable cache file {path}: {e}")
+        for path in files[:-self.max_entries]:
+            os.remove(path)
+        logger.info(f"Loaded {len(self.entries)} cached results from {self.persist_dir}")
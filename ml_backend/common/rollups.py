@@ -0,0 +1,194 @@
+import json
+import logging
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# Sessions kept per user and source for the trend
+ROLLUP_HISTORY = 20
+TOP_FILLER_WORDS = 5
+
+# source -> (results table, time column, confidence column or None)
+ROLLUP_SOURCES = {
+    'upload': ('analysis_results', 'created_at', 'confident_percentage'),
+    'audio': ('audio_results', 'created_at', None),
+    'webcam': ('emotion_results', 'timestamp', 'overall_confidence'),
+}
+
+
+# Parse the stored filler summary: "um: 2, like: 1" (upload/audio) or "um, like" (webcam)
+def parse_filler_words(value):
+    counts = Counter()
+    if not value or value == "None":
+        return counts
+    for item in value.split(','):
+        word, _, count = item.strip().partition(':')
+        word = word.strip()
+        if word:
+            counts[word] += int(count) if count.strip().isdigit() else 1
+    return counts
+
+
+# Running aggregates of one user's sessions from one source
+class RollupState:
+    def __init__(self, sessions=0, confident_sessions=0, confident_sum=0.0, recent=None, fillers=None, last_session_at=None):
+        self.sessions = sessions
+        self.confident_sessions = confident_sessions
+        self.confident_sum = confident_sum
+        self.recent = recent or []
+        self.fillers = Counter(fillers or {})
+        self.last_session_at = last_session_at
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            row['sessions'],
+            row['confident_sessions'],
+            row['confident_sum'],
+            json.loads(row['recent_confident'] or '[]'),
+            json.loads(row['filler_counts'] or '{}'),
+            row['last_session_at'],
+        )
+
+    def add(self, confident, filler_words, created_at):
+        self.sessions += 1
+        if confident is not None:
+            self.confident_sessions += 1
+            self.confident_sum += float(confident)
+            self.recent = (self.recent + [round(float(confident), 2)])[-ROLLUP_HISTORY:]
+        self.fillers.update(parse_filler_words(filler_words))
+        self.last_session_at = created_at
+
+    def params(self):
+        return (self.sessions, self.confident_sessions, self.confident_sum,
+                json.dumps(self.recent), json.dumps(dict(self.fillers)), self.last_session_at)
+
+    def summary(self):
+        return {
+            "sessions": self.sessions,
+            "average_confident_percentage": round(self.confident_sum / self.confident_sessions, 2) if self.confident_sessions else None,
+            "recent_confident_percentages": self.recent,
+            "trend": trend(self.recent),
+            "top_filler_words": [{"word": word, "count": count} for word, count in self.fillers.most_common(TOP_FILLER_WORDS)],
+            "last_session_at": self.last_session_at,
+        }
+
+
+# Least-squares slope of the recent percentages, in points per session
+def trend(values):
+    n = len(values)
+    if n < 2:
+        return None
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    numerator = sum((i - mean_x) * (y - mean_y) for i, y in enumerate(values))
+    denominator = sum((i - mean_x) ** 2 for i in range(n))
+    return round(numerator / denominator, 3)
+
+
+_UPDATE_SQL = (
+    'UPDATE report_rollups SET sessions = %s, confident_sessions = %s, confident_sum = %s, '
+    'recent_confident = %s, filler_counts = %s, last_session_at = %s WHERE user_id = %s AND source = %s'
+)
+
+
+# Maps a service's results-insert rows to rollup updates. Column positions
+# refer to the tuple bound to that service's INSERT statement.
+class Rollup:
+    def __init__(self, source, user_column, filler_column, time_column, confident_column=None):
+        self.source = source
+        self.user_column = user_column
+        self.filler_column = filler_column
+        self.time_column = time_column
+        self.confident_column = confident_column
+
+    # Fold inserted rows into their users' rollups inside the caller's transaction
+    def apply(self, cursor, rows):
+        by_user = {}
+        for row in rows:
+            by_user.setdefault(row[self.user_column], []).append(row)
+        for user_id, user_rows in by_user.items():
+            try:
+                self._apply_user(cursor, user_id, user_rows)
+            except Exception as e:
+                # Never lose the results row over its rollup; backfill_rollups.py repairs drift
+                logger.error(f"Failed to update {self.source} rollup for user {user_id}: {e}")
+
+    def _apply_user(self, cursor, user_id, rows):
+        cursor.execute(
+            "INSERT IGNORE INTO report_rollups (user_id, source, recent_confident, filler_counts) VALUES (%s, %s, '[]', '{}')",
+            (user_id, self.source)
+        )
+        cursor.execute(
+            'SELECT sessions, confident_sessions, confident_sum, recent_confident, filler_counts, last_session_at '
+            'FROM report_rollups WHERE user_id = %s AND source = %s FOR UPDATE',
+            (user_id, self.source)
+        )
+        state = RollupState.from_row(cursor.fetchone())
+        for row in rows:
+            confident = row[self.confident_column] if self.confident_column is not None else None
+            state.add(confident, row[self.filler_column], row[self.time_column])
+        cursor.execute(_UPDATE_SQL, state.params() + (user_id, self.source))
+
+
+# Per-source and overall summary for one user: reads at most one row per source
+def read_summary(pool, user_id):
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                'SELECT source, sessions, confident_sessions, confident_sum, recent_confident, filler_counts, last_session_at '
+                'FROM report_rollups WHERE user_id = %s',
+                (user_id,)
+            )
+            rows = cursor.fetchall()
+    sources = {row['source']: RollupState.from_row(row) for row in rows}
+    overall = RollupState()
+    for state in sources.values():
+        overall.sessions += state.sessions
+        overall.confident_sessions += state.confident_sessions
+        overall.confident_sum += state.confident_sum
+        overall.fillers.update(state.fillers)
+        if state.last_session_at and (not overall.last_session_at or state.last_session_at > overall.last_session_at):
+            overall.last_session_at = state.last_session_at
+    overall_summary = overall.summary()
+    del overall_summary["recent_confident_percentages"], overall_summary["trend"]
+    return {
+        "overall": overall_summary,
+        "sources": {source: state.summary() for source, state in sources.items()},
+    }
+
+
+# Rebuild rollups from the results tables, for one user or everyone
+def rebuild_rollups(pool, user_id=None, sources=ROLLUP_SOURCES):
+    import pymysql
+    rebuilt = 0
+    for source in sources:
+        table, time_column, confident_column = ROLLUP_SOURCES[source]
+        columns = f"user_id, filler_words, {time_column}" + (f", {confident_column}" if confident_column else "")
+        sql = f"SELECT {columns} FROM {table}"
+        params = ()
+        if user_id is not None:
+            sql += " WHERE user_id = %s"
+            params = (user_id,)
+        sql += f" ORDER BY user_id, {time_column}, id"
+        states = {}
+        with pool.connection() as conn:
+            with conn.cursor(pymysql.cursors.SSDictCursor) as cursor:
+                cursor.execute(sql, params)
+                for row in cursor:
+                    state = states.setdefault(row['user_id'], RollupState())
+                    state.add(row[confident_column] if confident_column else None, row['filler_words'], row[time_column])
+            with conn.cursor() as cursor:
+                if user_id is None:
+                    cursor.execute('DELETE FROM report_rollups WHERE source = %s', (source,))
+                else:
+                    cursor.execute('DELETE FROM report_rollups WHERE source = %s AND user_id = %s', (source, user_id))
+                cursor.executemany(
+                    'INSERT INTO report_rollups (sessions, confident_sessions, confident_sum, recent_confident, filler_counts, last_session_at, user_id, source) '
+                    'VALUES (%s, %s, %s, %s, %s, %s, %s, %s)',
+                    [state.params() + (uid, source) for uid, state in states.items()]
+                )
+            conn.commit()
+        logger.info(f"Rebuilt {len(states)} {source} rollups")
+        rebuilt += len(states)
+    return rebuilt
@@ -0,0 +1,111 @@
+import logging
+from concurrent.futures import CancelledError
+
+import numpy as np
+import speech_recognition as sr
+
+from common.audio import SAMPLE_RATE, to_audio_data
+
+logger = logging.getLogger(__name__)
+
+FRAME_MS = 30
+MIN_CHUNK_SECONDS = 3.0
+MAX_CHUNK_SECONDS = 30.0
+MIN_PAUSE_MS = 300
+# A frame is voiced when its RMS rises this far from the noise floor towards the speech level
+VOICED_FRACTION = 0.15
+# Absolute RMS floor so digital silence never counts as speech
+MIN_ENERGY = 100.0
+
+
+# Per-frame RMS energy of an int16 signal
+def frame_energy(samples, frame_len):
+    frame_count = len(samples) // frame_len
+    if frame_count == 0:
+        return np.zeros(0)
+    frames = samples[:frame_count * frame_len].astype(np.float32).reshape(frame_count, frame_len)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+# Split decoded audio into (start_sample, end_sample) chunks of at most
+# max_chunk_seconds, cutting in the middle of pauses where possible. Chunks
+# without any voiced frame are dropped.
+def split_on_silence(samples, sample_rate=SAMPLE_RATE, min_chunk_seconds=MIN_CHUNK_SECONDS,
+                     max_chunk_seconds=MAX_CHUNK_SECONDS, min_pause_ms=MIN_PAUSE_MS):
+    frame_len = int(sample_rate * FRAME_MS / 1000)
+    energy = frame_energy(samples, frame_len)
+    if energy.size == 0:
+        return [(0, len(samples))] if len(samples) else []
+    noise_floor, speech_level = np.percentile(energy, [10, 95])
+    threshold = max(noise_floor + (speech_level - noise_floor) * VOICED_FRACTION, MIN_ENERGY)
+    voiced = energy > threshold
+    min_pause = max(1, int(min_pause_ms / FRAME_MS))
+    min_frames = int(min_chunk_seconds * 1000 / FRAME_MS)
+    max_frames = max(1, int(max_chunk_seconds * 1000 / FRAME_MS))
+
+    # Midpoints of every pause long enough to cut at
+    pauses = []
+    run_start = None
+    for i, is_voiced in enumerate(voiced):
+        if not is_voiced and run_start is None:
+            run_start = i
+        elif is_voiced and run_start is not None:
+            if i - run_start >= min_pause:
+                pauses.append((run_start + i) // 2)
+            run_start = None
+
+    cuts = []
+    start = 0
+    for pause in pauses:
+        while pause - start > max_frames:
+            # No pause within the limit: cut at the quietest frame of the window
+            window = energy[start + min_frames:start + max_frames]
+            start = start + min_frames + int(np.argmin(window)) if window.size else start + max_frames
+            cuts.append(start)
+        if pause - start >= min_frames:
+            cuts.append(pause)
+            start = pause
+    while len(energy) - start > max_frames:
+        window = energy[start + min_frames:start + max_frames]
+        start = start + min_frames + int(np.argmin(window)) if window.size else start + max_frames
+        cuts.append(start)
+
+    bounds = [0] + cuts + [len(energy)]
+    chunks = []
+    for first, last in zip(bounds, bounds[1:]):
+        if voiced[first:last].any():
+            end = len(samples) if last == len(energy) else last * frame_len
+            chunks.append((first * frame_len, end))
+    return chunks
+
+
+# Default recognizer: Google Web Speech via speech_recognition
+def recognize_google(audio_data):
+    return sr.Recognizer().recognize_google(audio_data)
+
+
+# Transcribe each chunk concurrently on `executor` and stitch the texts back in
+# order. A chunk that fails becomes a gap; only when every chunk fails is the
+# last error re-raised. Setting `cancel_event` drops the chunks not yet
+# recognised and raises CancelledError once the current chunk is collected.
+def transcribe_chunks(samples, executor, recognize=recognize_google, sample_rate=SAMPLE_RATE, chunks=None, cancel_event=None):
+    chunks = split_on_silence(samples, sample_rate) if chunks is None else chunks
+    futures = [executor.submit(recognize, to_audio_data(samples[start:end], sample_rate)) for start, end in chunks]
+    segments = []
+    last_error = None
+    for (start, end), future in zip(chunks, futures):
+        if cancel_event and cancel_event.is_set():
+            for pending in futures:
+                pending.cancel()
+            raise CancelledError()
+        segment = {"start": round(start / sample_rate, 2), "end": round(end / sample_rate, 2), "text": None}
+        try:
+            segment["text"] = future.result().strip()
+        except Exception as e:
+            last_error = e
+            logger.warning(f"Chunk {segment['start']}-{segment['end']}s not transcribed: {type(e).__name__}")
+        segments.append(segment)
+    if not any(segment["text"] for segment in segments):
+        raise last_error or sr.UnknownValueError()
+    text = " ".join(segment["text"] for segment in segments if segment["text"])
+    return text, segments
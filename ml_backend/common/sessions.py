@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class SessionLimitError(Exception):
+    pass
+
+
+# Live per-user sessions of a realtime service. `factory(key)` builds a
+# session object exposing `running`, `last_seen` and `stop()`. Sessions that
+# are no longer running and have not been touched for `idle_timeout` seconds
+# are evicted on the next registry call; at most `max_sessions` may exist,
+# so a new session only fits if an idle one can be dropped.
+class SessionRegistry:
+    def __init__(self, factory, max_sessions=8, idle_timeout=300, name='sessions'):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.name = name
+        self.sessions = {}
+        self.lock = threading.Lock()
+        self.started = 0
+        self.evicted = 0
+        self.rejected = 0
+
+    # Replace the caller's session with a fresh one
+    def start(self, key):
+        with self.lock:
+            self._evict_idle()
+            previous = self.sessions.pop(key, None)
+            if previous:
+                previous.stop()
+            if len(self.sessions) >= self.max_sessions:
+                self._evict_oldest_finished()
+            if len(self.sessions) >= self.max_sessions:
+                self.rejected += 1
+                raise SessionLimitError(f"{self.max_sessions} {self.name} already active")
+            session = self.factory(key)
+            self.sessions[key] = session
+            self.started += 1
+        return session
+
+    def get(self, key):
+        with self.lock:
+            self._evict_idle()
+            session = self.sessions.get(key)
+        if session:
+            session.last_seen = time.monotonic()
+        return session
+
+    def remove(self, key):
+        with self.lock:
+            session = self.sessions.pop(key, None)
+        if session:
+            session.stop()
+        return session
+
+    def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        for key, session in list(self.sessions.items()):
+            if not session.running and session.last_seen < cutoff:
+                self._evict(key)
+
+    # At the cap, a finished session whose results were never fetched gives way to a new one
+    def _evict_oldest_finished(self):
+        finished = [(session.last_seen, key) for key, session in self.sessions.items() if not session.running]
+        if finished:
+            self._evict(min(finished)[1])
+
+    def _evict(self, key):
+        session = self.sessions.pop(key)
+        session.stop()
+        self.evicted += 1
+        logger.info(f"{self.name}: evicted idle session {key}")
+
+    def stats(self):
+        with self.lock:
+            sessions = list(self.sessions.values())
+        return {
+            "active": len(sessions),
+            "running": sum(1 for session in sessions if session.running),
+            "max_sessions": self.max_sessions,
+            "idle_timeout": self.idle_timeout,
+            "started": self.started,
+            "evicted": self.evicted,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+import time
+
+from flask import jsonify
+
+logger = logging.getLogger(__name__)
+
+# Pre-provisioned NLTK data (tools/provision_nltk_data.py); services never download at startup
+NLTK_DATA_DIR = os.environ.get(
+    'NLTK_DATA_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'nltk_data')
+)
+# Resource name -> NLTK paths that satisfy it (newer NLTK tokenizes with punkt_tab)
+NLTK_RESOURCES = {
+    'punkt': ('tokenizers/punkt_tab', 'tokenizers/punkt'),
+    'cmudict': ('corpora/cmudict',),
+}
+
+# How models are loaded: "background" starts a warmup thread at import,
+# "lazy" waits for the first request that needs them, "eager" loads inline
+MODEL_LOADING = os.environ.get('MODEL_LOADING', 'background')
+
+
+# Put the vendored NLTK data directory first on NLTK's search path and report
+# which resources are missing instead of downloading them
+def use_local_nltk_data(resources=('punkt',)):
+    import nltk
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    missing = []
+    for name in resources:
+        if not any(_nltk_has(path) for path in NLTK_RESOURCES[name]):
+            missing.append(name)
+    if missing:
+        logger.warning(f"NLTK data missing from {NLTK_DATA_DIR}: {', '.join(missing)} (run tools/provision_nltk_data.py)")
+    return missing
+
+
+def _nltk_has(path):
+    import nltk
+    try:
+        nltk.data.find(path)
+        return True
+    except LookupError:
+        return False
+
+
+# A model or other expensive object built on first use. The loader runs at
+# most once; callers arriving while it runs wait for the same result, and a
+# failed load is retried by the next caller.
+class LazyResource:
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.value = None
+        self.error = None
+        self.load_seconds = None
+        self.lock = threading.Lock()
+        self.loaded = threading.Event()
+
+    @property
+    def ready(self):
+        return self.loaded.is_set()
+
+    def get(self):
+        if self.loaded.is_set():
+            return self.value
+        with self.lock:
+            if not self.loaded.is_set():
+                start = time.perf_counter()
+                try:
+                    self.value = self.loader()
+                except Exception as e:
+                    self.error = str(e)
+                    logger.error(f"Failed to load {self.name}: {e}")
+                    raise
+                self.error = None
+                self.load_seconds = time.perf_counter() - start
+                self.loaded.set()
+                logger.info(f"{self.name} loaded in {self.load_seconds:.2f}s")
+        return self.value
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "error": self.error,
+        }
+
+
+# Liveness / readiness for one service: /healthz answers as soon as the
+# process serves requests, /readyz once every resource is loaded, the
+# required NLTK data is present and MySQL answers.
+class Readiness:
+    def __init__(self, db_pool, resources=(), nltk_resources=('punkt',)):
+        self.db_pool = db_pool
+        self.resources = list(resources)
+        self.nltk_resources = nltk_resources
+        self.started = time.monotonic()
+        self.missing_nltk = use_local_nltk_data(nltk_resources) if nltk_resources else []
+
+    # Load the resources according to MODEL_LOADING
+    def warm_up(self, mode=MODEL_LOADING):
+        if mode == 'eager':
+            self._load_all()
+        elif mode == 'background':
+            threading.Thread(target=self._load_all, name='warmup', daemon=True).start()
+
+    def _load_all(self):
+        for resource in self.resources:
+            try:
+                resource.get()
+            except Exception:
+                pass
+
+    # Block until every resource is loaded (benchmarks, tests)
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for resource in self.resources:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not resource.loaded.wait(remaining):
+                return False
+        return True
+
+    def _check_db(self):
+        try:
+            with self.db_pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            return None
+        except Exception as e:
+            return str(e)
+
+    def check(self):
+        db_error = self._check_db()
+        ready = db_error is None and not self.missing_nltk and all(r.ready for r in self.resources)
+        return ready, {
+            "models": {resource.name: resource.status() for resource in self.resources},
+            "db": {"ok": db_error is None, "error": db_error},
+            "nltk_data": {"ok": not self.missing_nltk, "missing": self.missing_nltk},
+        }
+
+    def register(self, app):
+        @app.route('/healthz', methods=['GET'])
+        def healthz():
+            return jsonify({"status": "ok", "uptime_seconds": round(time.monotonic() - self.started, 1)})
+
+        @app.route('/readyz', methods=['GET'])
+        def readyz():
+            if self.missing_nltk:
+                self.missing_nltk = use_local_nltk_data(self.nltk_resources)
+            ready, checks = self.check()
+            return jsonify({"ready": ready, "checks": checks}), 200 if ready else 503
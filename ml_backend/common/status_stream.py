@@ -0,0 +1,54 @@
+import json
+import time
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+# One Server-Sent Events message
+def sse_event(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+# Server-Sent Events carrying only what changed in a live status.
+#   snapshot() -> (fields, additions)
+# `fields` are sent when their value differs from the last one sent, the
+# lists in `additions` (entries appended since the previous call, e.g. new
+# transcript segments) whenever non-empty. snapshot() runs at most once per
+# `interval` seconds, so that is also the fastest rate events go out at; a
+# comment line every `heartbeat` quiet seconds keeps proxies from closing
+# the connection and notices clients that went away. The stream ends after
+# the event in which fields["running"] turns false.
+class StatusStream:
+    def __init__(self, snapshot, interval=0.5, heartbeat=15.0, event='status'):
+        self.snapshot = snapshot
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.event = event
+
+    def events(self):
+        sent = {}
+        event_id = 0
+        quiet_since = time.monotonic()
+        while True:
+            fields, additions = self.snapshot()
+            delta = {key: value for key, value in fields.items() if key not in sent or sent[key] != value}
+            delta.update((key, items) for key, items in additions.items() if items)
+            now = time.monotonic()
+            if delta:
+                event_id += 1
+                sent.update(fields)
+                quiet_since = now
+                yield sse_event(delta, self.event, event_id)
+            elif now - quiet_since >= self.heartbeat:
+                quiet_since = now
+                yield ": keepalive\n\n"
+            if not fields.get("running", True):
+                yield sse_event({}, 'end', event_id + 1)
+                return
+            time.sleep(self.interval)
@@ -0,0 +1,106 @@
+import re
+import threading
+from collections import Counter, deque
+
+# Feedback messages kept for /status and the final results
+FEEDBACK_HISTORY = 50
+# Characters of the transcript tail kept for overlays and /status
+RECENT_CHARS = 200
+
+
+# Running statistics of a live transcript. Each recognised segment is matched
+# and tokenized exactly once in add_segment; every reader gets precomputed
+# values, so the cost of /status does not grow with the session length.
+class TranscriptStats:
+    def __init__(self, matcher, feedback_history=FEEDBACK_HISTORY):
+        self.matcher = matcher
+        self.lock = threading.Lock()
+        self.parts = []
+        self.recent = ""
+        self.token_count = 0
+        self.segment_count = 0
+        self.confident_count = 0
+        self.unconfident_count = 0
+        self.fillers = Counter()
+        self.repetitions = 0
+        self.questions = 0
+        self.feedback = deque(maxlen=feedback_history)
+        self.feedback_total = 0
+
+    # Fold one recognised segment into the statistics; returns (verbal_confidence, feedback)
+    def add_segment(self, text):
+        text = re.sub(r'\s+', ' ', text.strip())
+        if not text:
+            return 0, []
+        found = self.matcher.match(text)
+        counts = found.counts()
+        confident_count = counts["confident"]
+        unconfident_count = counts["unconfident"]
+        total_phrases = confident_count + unconfident_count
+        verbal_confidence = (confident_count / total_phrases * 100) if total_phrases > 0 else 0
+        feedback = []
+        if unconfident_count > 0:
+            feedback.append(f"Detected uncertainty phrases: {', '.join(found.phrases('unconfident'))}")
+        if confident_count > 0:
+            feedback.append(f"Positive confident phrases used: {', '.join(found.phrases('confident'))}")
+        words = found.tokens
+        question = "?" in text
+        repeated = any(words[i] == words[i+1] for i in range(len(words) - 1))
+        if words:
+            if question:
+                feedback.append("Questioning tone detected - try making more definitive statements")
+            if repeated:
+                feedback.append("Word repetition detected - try to speak more fluidly")
+        segment_fillers = [phrase for phrase, _ in found.positions("filler")]
+        if segment_fillers:
+            feedback.append(f"Filler words detected: {', '.join(set(segment_fillers))}")
+
+        with self.lock:
+            # Same shape as clean_transcript over the whole text: one capital at the start
+            part = text.capitalize() if not self.parts else text.lower()
+            self.parts.append(part)
+            self.recent = (self.recent + " " + part)[-RECENT_CHARS:] if self.recent else part[-RECENT_CHARS:]
+            self.segment_count += 1
+            self.token_count += len(words)
+            self.confident_count += confident_count
+            self.unconfident_count += unconfident_count
+            self.fillers.update(segment_fillers)
+            self.repetitions += repeated
+            self.questions += question
+            self._add_feedback(feedback)
+        return verbal_confidence, feedback
+
+    def add_feedback(self, message):
+        with self.lock:
+            self._add_feedback([message])
+
+    def _add_feedback(self, messages):
+        self.feedback.extend(messages)
+        self.feedback_total += len(messages)
+
+    def transcript(self):
+        with self.lock:
+            return " ".join(self.parts)
+
+    def recent_text(self, chars):
+        with self.lock:
+            return self.recent[-chars:]
+
+    # Segments and feedback added since a reader saw `segments` segments and
+    # `feedback_total` messages, plus the new positions for the next call;
+    # feedback older than the kept history is skipped
+    def updates_since(self, segments, feedback_total):
+        with self.lock:
+            new_segments = self.parts[segments:]
+            unseen = min(self.feedback_total - feedback_total, len(self.feedback))
+            new_feedback = list(self.feedback)[len(self.feedback) - unseen:] if unseen > 0 else []
+            return new_segments, new_feedback, len(self.parts), self.feedback_total
+
+    def recent_feedback(self, count=None):
+        with self.lock:
+            items = list(self.feedback)
+        return items[-count:] if count else items
+
+    def filler_summary(self):
+        with self.lock:
+            return ", ".join(self.fillers) if self.fillers else "None"
@@ -0,0 +1,178 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Pause between spool replays while the database keeps rejecting writes
+SPOOL_RETRY_SECONDS = 10
+
+
+# Batches INSERTs off the request path. Rows go onto a bounded in-process
+# queue; a background thread flushes them with executemany once batch_size rows
+# are waiting or flush_interval seconds have passed. Rows that cannot be
+# written are appended to a JSON-lines spool file (capped at max_spool_bytes)
+# and replayed once the database accepts writes again. The queue is drained at
+# interpreter exit; rows still queued when close() times out are spooled.
+# on_batch(cursor, rows) runs in the same transaction as each flushed batch.
+class WriteBehindWriter:
+    def __init__(self, pool, sql, batch_size=50, flush_interval=1.0, max_queue=1000,
+                 spool_path=None, max_spool_bytes=50 * 1024 * 1024, name='write-behind', on_batch=None):
+        self.pool = pool
+        self.sql = sql
+        self.on_batch = on_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+        self.max_spool_bytes = max_spool_bytes
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.next_replay = 0
+        if spool_path:
+            os.makedirs(os.path.dirname(os.path.abspath(spool_path)), exist_ok=True)
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def submit(self, row):
+        try:
+            self.queue.put(tuple(row), timeout=1)
+        except queue.Full:
+            logger.warning("Write-behind queue full, spooling row")
+            self._spool([row])
+
+    def close(self, timeout=10):
+        if not self.thread.is_alive():
+            return
+        self.stop_event.set()
+        self.thread.join(timeout)
+        if not self.thread.is_alive():
+            return
+        # The writer is stuck on the database: keep what is still queued in the
+        # spool for the next start (or count it as dropped without one)
+        rows = []
+        while True:
+            try:
+                rows.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        dropped = self.dropped
+        if rows:
+            self._spool(rows)
+        logger.error(f"Write-behind writer did not drain within {timeout}s: {len(rows) - (self.dropped - dropped)} "
+                     f"queued rows spooled, {self.dropped - dropped} dropped, in-flight batch may be lost")
+
+    # Flushes until close() sets stop_event and the queue is empty
+    def _run(self):
+        while not (self.stop_event.is_set() and self.queue.empty()):
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = 0 if self.stop_event.is_set() else max(0, deadline - time.monotonic())
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if self.stop_event.is_set():
+                if batch:
+                    self._write(batch)
+            elif not batch or self._write(batch):
+                self._replay_spool()
+
+    def _write(self, rows):
+        try:
+            with self.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.executemany(self.sql, rows)
+                    if self.on_batch:
+                        self.on_batch(cursor, rows)
+                conn.commit()
+            with self.lock:
+                self.written += len(rows)
+                self.batches += 1
+            return True
+        except Exception as e:
+            logger.error(f"Write-behind flush of {len(rows)} rows failed: {e}")
+            with self.lock:
+                self.failures += 1
+            self._spool(rows)
+            self.next_replay = time.monotonic() + SPOOL_RETRY_SECONDS
+            return False
+
+    def _spool(self, rows):
+        if not self.spool_path:
+            with self.lock:
+                self.dropped += len(rows)
+            logger.error(f"Dropped {len(rows)} rows: no spool configured")
+            return
+        with self.lock:
+            size = os.path.getsize(self.spool_path) if os.path.exists(self.spool_path) else 0
+            if size >= self.max_spool_bytes:
+                self.dropped += len(rows)
+                logger.error(f"Spool {self.spool_path} is full, dropped {len(rows)} rows")
+                return
+            with open(self.spool_path, 'a') as f:
+                for row in rows:
+                    f.write(json.dumps(list(row), default=str) + '\n')
+            self.spooled += len(rows)
+
+    def _replay_spool(self):
+        if not self.spool_path or time.monotonic() < self.next_replay:
+            return
+        if not os.path.exists(self.spool_path) or not os.path.getsize(self.spool_path):
+            return
+        replay_path = self.spool_path + '.replay'
+        with self.lock:
+            os.replace(self.spool_path, replay_path)
+        with open(replay_path) as f:
+            rows = [tuple(json.loads(line)) for line in f if line.strip()]
+        os.remove(replay_path)
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i:i + self.batch_size]
+            if not self._write(batch):
+                self._spool(rows[i + self.batch_size:])
+                self.next_replay = time.monotonic() + SPOOL_RETRY_SECONDS
+                return
+            with self.lock:
+                self.replayed += len(batch)
+        logger.info(f"Replayed {len(rows)} spooled rows")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "queued": self.queue.qsize(),
+                "written": self.written,
+                "batches": self.batches,
+                "failures": self.failures,
+                "spooled": self.spooled,
+                "replayed": self.replayed,
+                "dropped": self.dropped,
+            }
+
+
+# Writer for `sql` when WRITE_BEHIND=1, else None (synchronous inserts)
+def writer_from_env(pool, sql, name, on_batch=None):
+    if os.environ.get('WRITE_BEHIND', '0').lower() not in ('1', 'true', 'yes'):
+        return None
+    spool_dir = os.environ.get('WRITE_BEHIND_SPOOL_DIR', 'spool')
+    return WriteBehindWriter(
+        pool,
+        sql,
+        batch_size=int(os.environ.get('WRITE_BEHIND_BATCH', 50)),
+        flush_interval=float(os.environ.get('WRITE_BEHIND_INTERVAL', 1.0)),
+        max_queue=int(os.environ.get('WRITE_BEHIND_QUEUE', 1000)),
+        spool_path=os.path.join(spool_dir, f"{name}.jsonl"),
+        name=f"write-behind-{name}",
+        on_batch=on_batch,
+    )
@@ -0,0 +1,6 @@
+-- Indexes backing the keyset-paginated /reports endpoints:
+-- WHERE user_id = ? [AND (time, id) < cursor] ORDER BY time DESC, id DESC
+-- InnoDB secondary indexes carry the primary key, so id needs no column of its own.
+ALTER TABLE analysis_results ADD INDEX idx_analysis_results_user_created (user_id, created_at);
+ALTER TABLE audio_results ADD INDEX idx_audio_results_user_created (user_id, created_at);
+ALTER TABLE emotion_results ADD INDEX idx_emotion_results_user_timestamp (user_id, timestamp);
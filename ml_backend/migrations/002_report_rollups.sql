@@ -0,0 +1,14 @@
+-- Per-user aggregates maintained by store_analysis_results and read by /reports/summary.
+-- Populate for existing rows with: python tools/backfill_rollups.py
+CREATE TABLE IF NOT EXISTS report_rollups (
+    user_id INT NOT NULL,
+    source VARCHAR(16) NOT NULL,
+    sessions INT NOT NULL DEFAULT 0,
+    confident_sessions INT NOT NULL DEFAULT 0,
+    confident_sum DOUBLE NOT NULL DEFAULT 0,
+    recent_confident TEXT NOT NULL,
+    filler_counts TEXT NOT NULL,
+    last_session_at DATETIME NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, source)
+);
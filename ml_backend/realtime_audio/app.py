@@ -2,42 +2,68 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import speech_recognition as sr
 import re
-import nltk
-from nltk.corpus import cmudict
 from collections import Counter
-import pymysql
-import requests
 import logging
 import threading
 import time
-from functools import lru_cache
-
-nltk.download('cmudict')
-nltk.download('punkt')
+import os
+import sys
+
+# Make the shared ml_backend modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.auth import token_validator_from_env
+from common.db import pool_from_env
+from common.reports import fetch_page, paged_response, parse_page_request
+from common.rollups import Rollup, read_summary
+from common.write_behind import writer_from_env
+from common.phonemes import load_phoneme_index
+from common.startup import LazyResource, Readiness
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}})
+CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}}, expose_headers=["ETag", "Link", "X-Next-Cursor"])
 
-# MySQL Configuration
+# MySQL connection pool; each DB call checks out its own connection. An
+# unreachable database only fails /readyz and the calls that need it.
+db_pool = pool_from_env()
 try:
-    db = pymysql.connect(
-        host='localhost',
-        user='root',
-        password='',
-        database='confidence_speaker',
-        cursorclass=pymysql.cursors.DictCursor
-    )
+    with db_pool.connection():
+        pass
     logger.info("MySQL connection established")
 except Exception as e:
     logger.error(f"Failed to connect to MySQL: {e}")
-    raise
 
-# Load CMU Pronouncing Dictionary
-cmu_dict = cmudict.dict()
+# Results insert; the timestamp is bound explicitly so queued or spooled rows keep their original time
+INSERT_AUDIO_SQL = (
+    'INSERT INTO audio_results (user_id, pronunciation, suggestion, most_repeated_words, filler_words, created_at) '
+    'VALUES (%s, %s, %s, %s, %s, %s)'
+)
+# Per-user report rollups updated with every insert (see /reports/summary)
+results_rollup = Rollup('audio', user_column=0, filler_column=4, time_column=5)
+# Optional write-behind writer (WRITE_BEHIND=1); None means inserts happen on the request path
+results_writer = writer_from_env(db_pool, INSERT_AUDIO_SQL, 'audio_results', on_batch=results_rollup.apply)
+
+# Columns served by /reports; `fields` / `exclude` select a subset
+REPORT_COLUMNS = [
+    'id',
+    'user_id',
+    'pronunciation',
+    'suggestion',
+    'most_repeated_words',
+    'filler_words',
+    'created_at',
+]
+
+# Memory-mapped phoneme counts compiled from CMUdict (tools/build_phoneme_index.py)
+phoneme_index = LazyResource('phoneme_index', load_phoneme_index)
+
+# /healthz and /readyz; the index is opened in a warmup thread unless MODEL_LOADING says otherwise
+readiness = Readiness(db_pool, resources=[phoneme_index])
+readiness.register(app)
+readiness.warm_up()
 
 # Global flag for stopping recognition
 stop_recognition = False
@@ -45,23 +71,11 @@ stop_recognition = False
 # Common filler words
 FILLER_WORDS = {'um', 'uh', 'like', 'you know', 'so', 'basically', 'actually'}
 
-# Cache CMUdict lookups
-@lru_cache(maxsize=10000)
-def get_phonemes(word):
-    return cmu_dict.get(word.lower(), [[]])[0]
+# Function to validate token (pooled connection to the auth service, short-lived cache)
+token_validator = token_validator_from_env()
 
-# Function to validate token
 def validate_token(token):
-    try:
-        response = requests.post(
-            "http://localhost:3003/api/auth/validate-token",
-            json={"token": token},
-            timeout=5
-        )
-        return response.json()
-    except requests.RequestException as e:
-        logger.error(f"Token validation failed: {e}")
-        return {"success": False, "message": f"Failed to validate token: {str(e)}"}
+    return token_validator.validate(token)
 
 # Speech recognition setup
 def transcribe_audio():
@@ -123,15 +137,15 @@ def assess_pronunciation(text):
 
         # Pronunciation assessment
         for word in words:
-            phonemes = get_phonemes(word)
-            if phonemes:
-                if len(phonemes) <= 1:
+            phoneme_count = phoneme_index.get().phoneme_count(word)
+            if phoneme_count:
+                if phoneme_count <= 1:
                     assessment = "Excellent vocabulary"
-                elif len(phonemes) <= 2:
+                elif phoneme_count <= 2:
                     assessment = "Good vocabulary"
-                elif len(phonemes) <= 3:
+                elif phoneme_count <= 3:
                     assessment = "Okay vocabulary"
-                elif len(phonemes) <= 4:
+                elif phoneme_count <= 4:
                     assessment = "Bad vocabulary"
                 else:
                     assessment = "Poor vocabulary"
@@ -155,18 +169,20 @@ def assess_pronunciation(text):
 
 # Store analysis results
 def store_analysis_results(user_id, pronunciation, suggestion, most_repeated_words, filler_words):
+    created_at = time.strftime('%Y-%m-%d %H:%M:%S')
+    row = (user_id, pronunciation, suggestion, most_repeated_words, filler_words, created_at)
+    if results_writer:
+        results_writer.submit(row)
+        return
     try:
-        cursor = db.cursor()
-        cursor.execute(
-            'INSERT INTO audio_results (user_id, pronunciation, suggestion, most_repeated_words, filler_words, created_at) '
-            'VALUES (%s, %s, %s, %s, %s, NOW())',
-            (user_id, pronunciation, suggestion, most_repeated_words, filler_words)
-        )
-        db.commit()
+        with db_pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(INSERT_AUDIO_SQL, row)
+                results_rollup.apply(cursor, [row])
+            conn.commit()
         logger.info("Analysis results stored in database")
     except Exception as e:
         logger.error(f"Failed to store analysis results: {e}")
-        db.rollback()
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
@@ -219,6 +235,17 @@ def stop_recording():
     stop_recognition = True
     return jsonify({"success": True, "message": "Recording stopped"})
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return jsonify({
+        "success": True,
+        "metrics": {
+            "auth": token_validator.stats(),
+            "db": db_pool.stats(),
+            "write_behind": results_writer.stats() if results_writer else None
+        }
+    })
+
 @app.route('/reports', methods=['GET'])
 def reports():
     auth_header = request.headers.get('Authorization')
@@ -233,18 +260,37 @@ def reports():
     user_id = token_response.get("user").get("id")
 
     try:
-        cursor = db.cursor()
-        cursor.execute(
-            'SELECT id, user_id, pronunciation, suggestion, most_repeated_words, filler_words, created_at '
-            'FROM audio_results WHERE user_id = %s ORDER BY created_at DESC',
-            (user_id,)
-        )
-        results = cursor.fetchall()
-        return jsonify(results)
+        page = parse_page_request(request.args, REPORT_COLUMNS, 'created_at')
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    try:
+        results, next_cursor = fetch_page(db_pool, 'audio_results', 'created_at', user_id, page)
+        return paged_response(jsonify(results), request, next_cursor)
     except Exception as e:
         logger.error(f"Failed to fetch reports: {e}")
         return jsonify({"success": False, "message": "Failed to fetch reports"}), 500
 
+@app.route('/reports/summary', methods=['GET'])
+def reports_summary():
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+
+    token = auth_header.split(" ")[1]
+    token_response = validate_token(token)
+    if not token_response.get("success"):
+        return jsonify({"success": False, "message": token_response.get("message", "Invalid token")}), 401
+
+    user_id = token_response.get("user").get("id")
+
+    try:
+        summary = read_summary(db_pool, user_id)
+        return jsonify({"success": True, "summary": summary})
+    except Exception as e:
+        logger.error(f"Failed to fetch report summary: {e}")
+        return jsonify({"success": False, "message": "Failed to fetch report summary"}), 500
+
 if __name__ == '__main__':
     logger.info("Starting Flask server on port 5001")
     app.run(debug=True, port=5001)
\ No newline at end of file
@@ -1,102 +1,217 @@
+import os
+import sys
 import time
 import threading
 import cv2
 import numpy as np
-import pymysql
 import speech_recognition as sr
-from keras.models import load_model
 from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
-import requests
 import logging
 from collections import Counter
-import nltk
-from nltk.tokenize import word_tokenize
-
-nltk.download('punkt')
+from concurrent.futures import ThreadPoolExecutor
+
+# Make the shared ml_backend modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.auth import token_validator_from_env
+from common.broadcast import MjpegBroadcaster, parse_stream_profile
+from common.db import pool_from_env
+from common.devices import SharedDevice, VideoCaptureDevice
+from common.face_tracker import FaceLocator
+from common.phrase_matcher import PhraseMatcher
+from common.pipeline import FramePipeline
+from common.prediction_cache import FacePredictionCache
+from common.reports import fetch_page, paged_response, parse_page_request
+from common.rollups import Rollup, read_summary
+from common.segmenter import recognize_google
+from common.sessions import SessionLimitError, SessionRegistry
+from common.inference import load_emotion_backend
+from common.live_audio import AudioDevice, LiveTranscriber, SharedAudioSource
+from common.startup import LazyResource, Readiness
+from common.status_stream import SSE_HEADERS, StatusStream
+from common.transcript_stats import TranscriptStats
+from common.write_behind import writer_from_env
 
 app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}})
+CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}}, expose_headers=["ETag", "Link", "X-Next-Cursor"])
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# MySQL Configuration
+# MySQL connection pool; each DB call checks out its own connection. An
+# unreachable database only fails /readyz and the calls that need it.
+db_pool = pool_from_env()
 try:
-    db = pymysql.connect(
-        host='localhost',
-        user='root',
-        password='',
-        database='confidence_speaker',
-        cursorclass=pymysql.cursors.DictCursor
-    )
+    with db_pool.connection():
+        pass
     logger.info("MySQL connection established")
 except Exception as e:
     logger.error(f"Failed to connect to MySQL: {e}")
-    raise
 
-# Load the pre-trained emotion classification model
-try:
-    emotion_model = load_model('./emotion_classifier.h5')
-    logger.info("Emotion model loaded successfully")
-except Exception as e:
-    logger.error(f"Failed to load emotion model: {e}")
-    raise
-
-# Load the Haar cascade for face detection
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-if face_cascade.empty():
-    logger.error("Failed to load Haar cascade")
-    raise Exception("Haar cascade not found")
-
-# Global variables for webcam and emotion detection
-video_stream = None
-running = False
-total_frames = 0
-confident_count = 0
-not_confident_count = 0
-transcribed_speech = ""
-speech_feedback = []
-confident_words_count = 0
-unconfident_words_count = 0
-filler_words_found = []
-analysis_start_time = 0
+# Results insert; the timestamp is bound explicitly so queued or spooled rows keep their original time
+INSERT_EMOTION_SQL = (
+    'INSERT INTO emotion_results (user_id, confident_percentage, visual_confidence, verbal_confidence, overall_confidence, transcribed_speech, filler_words, timestamp) '
+    'VALUES (%s, %s, %s, %s, %s, %s, %s, %s)'
+)
+# Per-user report rollups updated with every insert (see /reports/summary)
+results_rollup = Rollup('webcam', user_column=0, filler_column=6, time_column=7, confident_column=4)
+# Optional write-behind writer (WRITE_BEHIND=1); None means inserts happen on the request path
+results_writer = writer_from_env(db_pool, INSERT_EMOTION_SQL, 'emotion_results', on_batch=results_rollup.apply)
+
+# Columns served by /reports; `fields` / `exclude` select a subset
+REPORT_COLUMNS = [
+    'id',
+    'confident_percentage',
+    'visual_confidence',
+    'verbal_confidence',
+    'overall_confidence',
+    'transcribed_speech',
+    'filler_words',
+    'timestamp',
+]
+
+# Emotion model on the engine chosen by EMOTION_BACKEND (keras, numpy or int8, see
+# common/inference.py); TensorFlow is only imported by the keras backend
+emotion_model = LazyResource('emotion_model', load_emotion_backend)
+
+# Haar cascade for face detection
+def load_face_cascade():
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    if cascade.empty():
+        raise Exception("Haar cascade not found")
+    return cascade
+
+face_cascade = LazyResource('face_cascade', load_face_cascade)
+
+# /healthz and /readyz; models load in a warmup thread unless MODEL_LOADING says otherwise
+readiness = Readiness(db_pool, resources=[emotion_model, face_cascade], nltk_resources=())
+readiness.register(app)
+readiness.warm_up()
+
 ANALYSIS_DURATION = 60  # seconds
 
-# Common filler words
-FILLER_WORDS = {'um', 'uh', 'like', 'you know', 'so', 'basically', 'actually', 'well', 'er', 'ahm', 'i mean', 'sort of', 'kind of', 'yep', 'right'}
+# Frames buffered between video pipeline stages; older frames are dropped
+PIPELINE_QUEUE_SIZE = int(os.environ.get('PIPELINE_QUEUE_SIZE', 1))
+
+# /video_feed output: every client of a session shares one capture. Each may
+# ask for its own ?width= and ?quality=, defaulting to these (width 0 = camera
+# resolution); frames buffered per client, a slow client's oldest are dropped
+STREAM_WIDTH = int(os.environ.get('STREAM_WIDTH', 0))
+STREAM_JPEG_QUALITY = int(os.environ.get('STREAM_JPEG_QUALITY', 95))
+STREAM_CLIENT_BUFFER = int(os.environ.get('STREAM_CLIENT_BUFFER', 2))
+
+# /status/stream sends a status delta at most every STATUS_STREAM_INTERVAL
+# seconds, and a keepalive after STATUS_STREAM_HEARTBEAT seconds without one
+STATUS_STREAM_INTERVAL = float(os.environ.get('STATUS_STREAM_INTERVAL', 0.5))
+STATUS_STREAM_HEARTBEAT = float(os.environ.get('STATUS_STREAM_HEARTBEAT', 15))
+
+# Speech is captured continuously from AUDIO_SOURCE: 'microphone', or for
+# running without one 'synthetic' or the path of a 16-bit WAV file played in
+# real time. Utterances are recognised on RECOGNITION_WORKERS threads shared by
+# all sessions; recognize_speech takes an sr.AudioData and returns text
+AUDIO_SOURCE = os.environ.get('AUDIO_SOURCE', 'microphone')
+RECOGNITION_WORKERS = int(os.environ.get('RECOGNITION_WORKERS', 4))
+recognition_executor = ThreadPoolExecutor(max_workers=RECOGNITION_WORKERS, thread_name_prefix='recognize')
+recognize_speech = recognize_google
+
+# The camera (CAMERA_DEVICE: index or video file) and the audio source are each
+# opened once for the process and shared by all sessions; AUDIO_BUFFER_CHUNKS
+# 64 ms chunks are buffered per session before its oldest are dropped
+CAMERA_DEVICE = os.environ.get('CAMERA_DEVICE', '0')
+AUDIO_BUFFER_CHUNKS = int(os.environ.get('AUDIO_BUFFER_CHUNKS', 64))
+camera = SharedDevice(
+    lambda: VideoCaptureDevice(int(CAMERA_DEVICE) if CAMERA_DEVICE.isdigit() else CAMERA_DEVICE),
+    buffer_size=1, name='camera'
+)
+microphone = SharedDevice(lambda: AudioDevice(AUDIO_SOURCE), buffer_size=AUDIO_BUFFER_CHUNKS, name='microphone')
+
+# A face's last prediction is reused while its 48x48 crop differs from the
+# inferred one by at most PREDICTION_CACHE_THRESHOLD grey levels on average,
+# for up to PREDICTION_CACHE_MAX_AGE seconds (threshold 0 = always infer)
+PREDICTION_CACHE_THRESHOLD = float(os.environ.get('PREDICTION_CACHE_THRESHOLD', 3.0))
+PREDICTION_CACHE_MAX_AGE = float(os.environ.get('PREDICTION_CACHE_MAX_AGE', 0.5))
+
+# Confident, unconfident and filler phrase lists; PHRASES_CONFIG may point to
+# another JSON file with the same keys. One matcher finds all of them in a
+# single pass over each segment.
+PHRASES_CONFIG = os.environ.get('PHRASES_CONFIG', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'phrases.json'))
+phrase_matcher = PhraseMatcher.from_config(PHRASES_CONFIG)
+
+# State of one user's analysis: frame counters, transcript statistics, the
+# speech thread, the video broadcaster and the deadline after which the
+# analysis stops by itself
+class WebcamSession:
+    __slots__ = (
+        'user_id', 'started_at', 'deadline', 'stop_event', 'total_frames', 'confident_count',
+        'not_confident_count', 'transcript_stats', 'prediction_cache', 'speech_thread', 'transcriber', 'broadcaster', 'last_seen',
+    )
 
-# Function to validate token with Express backend
-def validate_token(token):
-    try:
-        response = requests.post(
-            "http://localhost:3003/api/auth/validate-token",
-            json={"token": token},
-            timeout=5
+    def __init__(self, user_id, duration=ANALYSIS_DURATION):
+        self.user_id = user_id
+        self.started_at = time.time()
+        self.deadline = time.monotonic() + duration
+        self.stop_event = threading.Event()
+        self.total_frames = 0
+        self.confident_count = 0
+        self.not_confident_count = 0
+        self.transcript_stats = TranscriptStats(phrase_matcher)
+        self.prediction_cache = FacePredictionCache(PREDICTION_CACHE_THRESHOLD, PREDICTION_CACHE_MAX_AGE)
+        self.speech_thread = None
+        self.transcriber = None
+        self.broadcaster = MjpegBroadcaster(
+            lambda encode: open_webcam_pipeline(self, encode),
+            buffer_size=STREAM_CLIENT_BUFFER, name=f"webcam-{user_id}"
         )
-        logger.debug(f"Token validation response: {response.json()}")
-        return response.json()
-    except requests.RequestException as e:
-        logger.error(f"Token validation failed: {e}")
-        return {"success": False, "message": f"Failed to validate token: {str(e)}"}
-
-# Clean transcript
-def clean_transcript(text):
-    import re
-    text = re.sub(r'\s+', ' ', text.strip())
-    text = text.capitalize()
-    return text if text else "No speech detected"
-
-# Function to predict emotion from face
-def predict_emotion(face_roi):
+        self.last_seen = time.monotonic()
+
+    @property
+    def running(self):
+        if self.stop_event.is_set():
+            return False
+        if time.monotonic() >= self.deadline:
+            logger.info(f"Analysis for user {self.user_id} completed after {ANALYSIS_DURATION} seconds")
+            self.stop_event.set()
+            return False
+        return True
+
+    def time_left(self):
+        return max(0.0, self.deadline - time.monotonic()) if self.running else 0.0
+
+    def start(self):
+        self.speech_thread = threading.Thread(target=speech_recognition_thread, args=(self,), daemon=True)
+        self.speech_thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.broadcaster.stop()
+
+# One session per user; MAX_SESSIONS caps concurrent analyses and finished
+# sessions are dropped after SESSION_IDLE_TIMEOUT seconds without requests
+sessions = SessionRegistry(
+    WebcamSession,
+    max_sessions=int(os.environ.get('MAX_SESSIONS', 8)),
+    idle_timeout=int(os.environ.get('SESSION_IDLE_TIMEOUT', 300)),
+    name='webcam sessions'
+)
+
+# Function to validate token with Express backend (pooled connection, short-lived cache)
+token_validator = token_validator_from_env()
+
+def validate_token(token):
+    return token_validator.validate(token)
+
+# 48x48 grayscale crop of a face, as fed to the model and compared by the prediction cache
+def face_crop(face_roi):
+    return cv2.cvtColor(cv2.resize(face_roi, (48, 48)), cv2.COLOR_BGR2GRAY)
+
+# Function to predict emotion from a face_crop()
+def predict_emotion_crop(face_roi):
     try:
-        face_roi = cv2.resize(face_roi, (48, 48))
-        face_roi = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
         face_roi = face_roi.astype("float") / 255.0
         face_roi = np.expand_dims(face_roi, axis=0)
         face_roi = np.expand_dims(face_roi, axis=-1)
-        preds = emotion_model.predict(face_roi)[0]
+        preds = emotion_model.get().predict_on_batch(face_roi)[0]
         confident_score = preds[0] + preds[3] + preds[4]  # Happy + Surprised + Neutral
         not_confident_score = preds[2]  # Sad
         emotion_label = "Confident" if confident_score > not_confident_score else "Not Confident"
@@ -105,175 +220,117 @@ def predict_emotion(face_roi):
         logger.error(f"Emotion prediction failed: {e}")
         return "Not Confident", 0
 
-# Function to detect filler words
-def detect_filler_words(text):
-    words = word_tokenize(text.lower())
-    fillers = [word for word in words if word in FILLER_WORDS]
-    return fillers
-
-# Function to analyze speech confidence
-def analyze_speech_confidence(speech_text):
-    global confident_words_count, unconfident_words_count, filler_words_found
-    confident_phrases = [
-        "sure", "definitely", "absolutely", "certainly", "no doubt", "confident",
-        "positive", "clearly", "without question", "undoubtedly", "I know",
-        "I'm certain", "I'm sure", "exactly", "precisely", "obviously", "indeed",
-        "of course", "absolutely", "strongly believe", "convinced", "guarantee",
-        "assure", "confident", "without hesitation", "firmly", "decisive",
-        "assertive", "knowledgeable", "expert", "mastery", "deep understanding",
-        "extensive experience", "solid evidence", "proven", "demonstrated",
-        "verified", "validated", "confirmed"
-    ]
-    unconfident_phrases = [
-        "maybe", "perhaps", "possibly", "I think", "I guess", "sort of", "kind of",
-        "I'm not sure", "I don't know", "um", "uh", "like", "hopefully", "probably",
-        "might", "could be", "I suppose", "somewhat", "not really", "I'm trying",
-        "nervous", "anxious", "worried", "confused", "hesitant", "unsure",
-        "doubtful", "uncertain", "if possible", "it seems", "appears to be",
-        "from what I understand", "correct me if I'm wrong", "this might not be right",
-        "to some extent", "more or less", "basically", "approximately", "roughly",
-        "almost", "barely", "hardly", "scarcely", "just a bit", "slightly",
-        "not completely", "partially", "somehow", "in a way", "allegedly",
-        "would", "could", "may", "might be", "try to", "attempt to", "wish to",
-        "hope to", "plan to", "intend to", "aim to", "want to", "would like to",
-        "wondering if", "not sure if"
-    ]
-    confident_count = sum(1 for phrase in confident_phrases if phrase in speech_text.lower())
-    unconfident_count = sum(1 for phrase in unconfident_phrases if phrase in speech_text.lower())
-    confident_words_count += confident_count
-    unconfident_words_count += unconfident_count
-    total_phrases = confident_count + unconfident_count
-    verbal_confidence = (confident_count / total_phrases * 100) if total_phrases > 0 else 0
-    feedback = []
-    if unconfident_count > 0:
-        used_unconfident = [phrase for phrase in unconfident_phrases if phrase in speech_text.lower()]
-        feedback.append(f"Detected uncertainty phrases: {', '.join(used_unconfident)}")
-    if confident_count > 0:
-        used_confident = [phrase for phrase in confident_phrases if phrase in speech_text.lower()]
-        feedback.append(f"Positive confident phrases used: {', '.join(used_confident)}")
-    word_count = len(word_tokenize(speech_text))
-    if word_count > 0:
-        if "?" in speech_text:
-            feedback.append("Questioning tone detected - try making more definitive statements")
-        words = word_tokenize(speech_text.lower())
-        for i in range(len(words) - 1):
-            if words[i] == words[i+1]:
-                feedback.append("Word repetition detected - try to speak more fluidly")
-                break
-    # Detect filler words
-    segment_fillers = detect_filler_words(speech_text)
-    filler_words_found.extend(segment_fillers)
-    if segment_fillers:
-        feedback.append(f"Filler words detected: {', '.join(set(segment_fillers))}")
-    return verbal_confidence, feedback
+# Function to analyze speech confidence of one recognised segment
+def analyze_speech_confidence(session, speech_text):
+    return session.transcript_stats.add_segment(speech_text)
 
 # Function to store results in database
 def store_analysis_results(user_id, confident_percentage, visual_confidence, verbal_confidence, overall_confidence, transcribed_speech, filler_words):
+    created_at = time.strftime('%Y-%m-%d %H:%M:%S')
+    row = (user_id, confident_percentage, visual_confidence, verbal_confidence, overall_confidence, transcribed_speech, filler_words, created_at)
+    if results_writer:
+        results_writer.submit(row)
+        return
     try:
-        cursor = db.cursor()
-        cursor.execute(
-            'INSERT INTO emotion_results (user_id, confident_percentage, visual_confidence, verbal_confidence, overall_confidence, transcribed_speech, filler_words, timestamp) '
-            'VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())',
-            (user_id, confident_percentage, visual_confidence, verbal_confidence, overall_confidence, transcribed_speech, filler_words)
-        )
-        db.commit()
+        with db_pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(INSERT_EMOTION_SQL, row)
+                results_rollup.apply(cursor, [row])
+            conn.commit()
         logger.info("Analysis results stored in database")
     except Exception as e:
         logger.error(f"Failed to store analysis results: {e}")
-        db.rollback()
-
-# Function to capture and process webcam feed
-def process_webcam_feed():
-    global running, total_frames, confident_count, not_confident_count
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        logger.error("Failed to open webcam")
-        return
-    logger.info("Webcam opened successfully")
-    while running:
-        ret, frame = cap.read()
-        if not ret:
-            logger.error("Failed to capture frame")
-            break
-        elapsed = time.time() - analysis_start_time
-        time_left = max(0, ANALYSIS_DURATION - elapsed)
+
+# Capture and face-analysis stages for a session's video broadcaster. Capture,
+# face analysis and JPEG encoding run as separate pipeline stages, so slow
+# inference skips frames rather than stalling the stream. Frames come from the
+# shared camera; the session's subscription ends when the pipeline stops.
+def open_webcam_pipeline(session, encode):
+    if not session.running:
+        return None
+    face_cascade.get()
+    # CascadeClassifier is not safe to share between threads; each session's annotate stage gets its own
+    locator = FaceLocator(load_face_cascade())
+    try:
+        feed = camera.subscribe()
+    except Exception as e:
+        logger.error(f"Failed to open webcam: {e}")
+        return None
+
+    # Each session draws its overlays on its own copy of the shared frame
+    def capture():
+        frame = feed.read()
+        return (False, None) if frame is None else (True, frame.copy())
+
+    def annotate(frame):
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+        faces = locator.locate(gray)
         for (x, y, w, h) in faces:
-            face_roi = frame[y:y+h, x:x+w]
-            emotion_label, confidence_score = predict_emotion(face_roi)
-            total_frames += 1
+            crop = face_crop(frame[y:y+h, x:x+w])
+            emotion_label, confidence_score = session.prediction_cache.predict(crop, (x, y, w, h), predict_emotion_crop)
+            session.total_frames += 1
             if emotion_label == "Confident":
-                confident_count += 1
+                session.confident_count += 1
             else:
-                not_confident_count += 1
+                session.not_confident_count += 1
             color = (0, 255, 0) if emotion_label == "Confident" else (0, 0, 255)
             cv2.rectangle(frame, (x, y), (x+w, y+h), color, 2)
             cv2.putText(frame, f"{emotion_label}: {confidence_score:.2f}",
                         (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
-        cv2.putText(frame, f"Speech: {transcribed_speech[-50:] if len(transcribed_speech) > 50 else transcribed_speech}",
+        cv2.putText(frame, f"Speech: {session.transcript_stats.recent_text(50)}",
                     (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-        cv2.putText(frame, f"Time left: {time_left:.1f}s",
+        cv2.putText(frame, f"Time left: {session.time_left():.1f}s",
                     (10, frame.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-        ret, buffer = cv2.imencode('.jpg', frame)
-        if not ret:
-            logger.error("Failed to encode frame")
-            continue
-        frame_bytes = buffer.tobytes()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-    logger.info("Releasing webcam")
-    cap.release()
-
-# Speech recognition thread
-def speech_recognition_thread():
-    global running, transcribed_speech, speech_feedback
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        recognizer.adjust_for_ambient_noise(source, duration=1)
-    while running:
-        try:
-            with sr.Microphone() as source:
-                logger.info("Listening for speech...")
-                audio = recognizer.listen(source, timeout=5, phrase_time_limit=15)
-            try:
-                text = recognizer.recognize_google(audio)
-                logger.info(f"Recognized: {text}")
-                text = clean_transcript(text)
-                transcribed_speech += text + " "
-                transcribed_speech = clean_transcript(transcribed_speech)
-                _, segment_feedback = analyze_speech_confidence(text)
-                speech_feedback.extend(segment_feedback)
-            except sr.UnknownValueError:
-                logger.debug("Speech not understood")
-                speech_feedback.append("Partial speech not understood")
-            except sr.RequestError as e:
-                logger.error(f"Speech recognition error: {e}")
-                speech_feedback.append("Speech recognition service unavailable")
-        except Exception as e:
-            logger.error(f"Speech recognition thread error: {e}")
-            speech_feedback.append("Error capturing speech")
-        time.sleep(0.1)
-
-# Timer thread to stop analysis
-def timer_thread():
-    global running
-    while running:
-        elapsed_time = time.time() - analysis_start_time
-        if elapsed_time >= ANALYSIS_DURATION:
-            logger.info(f"Analysis completed after {ANALYSIS_DURATION} seconds")
-            running = False
-            break
-        time.sleep(0.1)
+        return frame
+
+    return FramePipeline(capture, annotate, encode, running=lambda: session.running,
+                         queue_size=PIPELINE_QUEUE_SIZE, name=f"webcam-{session.user_id}", on_stop=feed.close)
+
+# Speech recognition thread: listens to the shared audio source for the whole
+# session while utterances are recognised in the background
+def speech_recognition_thread(session):
+    transcript_stats = session.transcript_stats
+
+    def on_text(text):
+        logger.info(f"Recognized: {text}")
+        analyze_speech_confidence(session, text)
+
+    def on_error(error):
+        if isinstance(error, sr.UnknownValueError):
+            logger.debug("Speech not understood")
+            transcript_stats.add_feedback("Partial speech not understood")
+        elif isinstance(error, sr.RequestError):
+            logger.error(f"Speech recognition error: {error}")
+            transcript_stats.add_feedback("Speech recognition service unavailable")
+        else:
+            logger.error(f"Speech recognition failed: {error}")
+            transcript_stats.add_feedback("Error capturing speech")
+
+    try:
+        session.transcriber = LiveTranscriber(
+            SharedAudioSource(microphone), recognition_executor, recognize_speech,
+            on_text=on_text, on_error=on_error, running=lambda: session.running, name=f"speech-{session.user_id}"
+        )
+        session.transcriber.run()
+    except Exception as e:
+        logger.error(f"Speech recognition thread error: {e}")
+        transcript_stats.add_feedback("Error capturing speech")
 
 # Calculate results
-def calculate_results():
-    global total_frames, confident_count, not_confident_count, confident_words_count, unconfident_words_count, filler_words_found
+def calculate_results(session):
+    transcript_stats = session.transcript_stats
+    total_frames = session.total_frames
+    confident_count = session.confident_count
+    not_confident_count = session.not_confident_count
+    confident_words_count = transcript_stats.confident_count
+    unconfident_words_count = transcript_stats.unconfident_count
     visual_confidence = (confident_count / total_frames * 100) if total_frames > 0 else 0
     total_word_markers = confident_words_count + unconfident_words_count
     verbal_confidence = (confident_words_count / total_word_markers * 100) if total_word_markers > 0 else 50
     overall_confidence = (visual_confidence * 0.6) + (verbal_confidence * 0.4) if total_frames > 0 and total_word_markers > 0 else (visual_confidence or verbal_confidence or 0)
-    filler_words_str = ", ".join(set(filler_words_found)) if filler_words_found else "None"
+    filler_words_str = transcript_stats.filler_summary()
+    transcribed_speech = transcript_stats.transcript()
+    speech_feedback = transcript_stats.recent_feedback()
     return {
         "confident_percentage": round(overall_confidence, 2),
         "visual_confidence": round(visual_confidence, 2),
@@ -295,10 +352,6 @@ def calculate_results():
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
-    global running, total_frames, confident_count, not_confident_count
-    global transcribed_speech, speech_feedback, confident_words_count, unconfident_words_count, filler_words_found
-    global analysis_start_time
-
     logger.debug("Received request for /analyze")
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
@@ -315,27 +368,13 @@ def analyze():
     user_id = user.get("id")
     logger.debug(f"Authenticated user_id: {user_id}")
 
-    # Reset variables
-    running = True
-    total_frames = 0
-    confident_count = 0
-    not_confident_count = 0
-    transcribed_speech = ""
-    speech_feedback = []
-    confident_words_count = 0
-    unconfident_words_count = 0
-    filler_words_found = []
-    analysis_start_time = time.time()
-
-    # Start speech recognition thread
-    speech_thread = threading.Thread(target=speech_recognition_thread)
-    speech_thread.daemon = True
-    speech_thread.start()
-
-    # Start timer thread
-    timer_thread_instance = threading.Thread(target=timer_thread)
-    timer_thread_instance.daemon = True
-    timer_thread_instance.start()
+    # A new analysis replaces the caller's previous session only
+    try:
+        session = sessions.start(user_id)
+    except SessionLimitError as e:
+        logger.warning(f"Rejected analysis for user_id {user_id}: {e}")
+        return jsonify({"success": False, "message": "Too many analyses in progress, try again shortly"}), 429
+    session.start()
 
     return jsonify({"success": True, "message": "Analysis started", "duration": ANALYSIS_DURATION})
 
@@ -357,8 +396,18 @@ def video_feed():
         logger.error(f"Token validation failed: {token_response.get('message')}")
         return jsonify({"success": False, "message": token_response.get("message", "Invalid token")}), 401
 
+    user_id = token_response.get("user").get("id")
+    session = sessions.get(user_id)
+    if not session:
+        return jsonify({"success": False, "message": "No analysis session"}), 404
+
+    try:
+        width, quality = parse_stream_profile(request.args, STREAM_WIDTH, STREAM_JPEG_QUALITY)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
     logger.info("Video feed authorized, starting stream")
-    return Response(process_webcam_feed(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    return Response(session.broadcaster.stream(width, quality), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route('/results', methods=['GET'])
 def results():
@@ -378,10 +427,13 @@ def results():
     user_id = user.get("id")
     logger.debug(f"Authenticated user_id: {user_id}")
 
-    if running:
+    session = sessions.get(user_id)
+    if not session:
+        return jsonify({"success": False, "message": "No analysis session"}), 404
+    if session.running:
         return jsonify({"success": False, "message": "Analysis still running"}), 400
 
-    results = calculate_results()
+    results = calculate_results(session)
     store_analysis_results(
         user_id,
         results["confident_percentage"],
@@ -396,7 +448,6 @@ def results():
 
 @app.route('/stop', methods=['POST'])
 def stop():
-    global running
     logger.debug("Received request to stop analysis")
     auth_header = request.headers.get('Authorization')
     if not auth_header or not auth_header.startswith('Bearer '):
@@ -413,11 +464,12 @@ def stop():
     user_id = user.get("id")
     logger.debug(f"Authenticated user_id: {user_id}")
 
-    if not running:
+    session = sessions.get(user_id)
+    if not session or not session.running:
         return jsonify({"success": False, "message": "No analysis running"}), 400
 
-    running = False
-    results = calculate_results()
+    session.stop()
+    results = calculate_results(session)
     if not results["transcribed_speech"] or results["transcribed_speech"] == "No speech detected":
         results["transcribed_speech"] = "Partial speech detected"
     store_analysis_results(
@@ -432,6 +484,22 @@ def stop():
     logger.info("Analysis stopped and results stored")
     return jsonify({"success": True, "result": results})
 
+# /status of a user without a session: the shape of an analysis that has not started
+IDLE_STATUS = {
+    "success": True,
+    "running": False,
+    "frames_analyzed": 0,
+    "visual_confidence": 0,
+    "speech_length": 0,
+    "recent_speech": "",
+    "speech_feedback": ["No feedback yet"],
+    "filler_words": "None",
+    "time_remaining": 0.0,
+    "stream": None,
+    "inference": None,
+    "speech": None
+}
+
 @app.route('/status', methods=['GET'])
 def status():
     logger.debug("Checking analysis status")
@@ -446,19 +514,90 @@ def status():
         logger.error(f"Token validation failed: {token_response.get('message')}")
         return jsonify({"success": False, "message": token_response.get("message", "Invalid token")}), 401
 
-    elapsed = time.time() - analysis_start_time
-    time_left = max(0, ANALYSIS_DURATION - elapsed) if running else 0
-    visual_confidence = (confident_count / total_frames * 100) if total_frames > 0 else 0
+    user_id = token_response.get("user").get("id")
+    session = sessions.get(user_id)
+    if not session:
+        return jsonify(IDLE_STATUS)
+    transcript_stats = session.transcript_stats
+    visual_confidence = (session.confident_count / session.total_frames * 100) if session.total_frames > 0 else 0
     return jsonify({
         "success": True,
-        "running": running,
-        "frames_analyzed": total_frames,
+        "running": session.running,
+        "frames_analyzed": session.total_frames,
         "visual_confidence": round(visual_confidence, 2),
-        "speech_length": len(word_tokenize(transcribed_speech)),
-        "recent_speech": transcribed_speech[-100:] if len(transcribed_speech) > 100 else transcribed_speech,
-        "speech_feedback": speech_feedback[-5:] if speech_feedback else ["No feedback yet"],
-        "filler_words": ", ".join(set(filler_words_found)) if filler_words_found else "None",
-        "time_remaining": round(time_left, 1)
+        "speech_length": transcript_stats.token_count,
+        "recent_speech": transcript_stats.recent_text(100),
+        "speech_feedback": transcript_stats.recent_feedback(5) or ["No feedback yet"],
+        "filler_words": transcript_stats.filler_summary(),
+        "time_remaining": round(session.time_left(), 1),
+        "stream": session.broadcaster.stats(),
+        "inference": session.prediction_cache.stats(),
+        "speech": session.transcriber.stats() if session.transcriber else None
+    })
+
+# Status fields pushed by /status/stream, with the transcript segments and
+# feedback added since the previous call. Time remaining is whole seconds so
+# a quiet session changes at most once per second.
+def status_snapshot(session):
+    cursor = {"segments": 0, "feedback": 0}
+
+    def snapshot():
+        transcript_stats = session.transcript_stats
+        segments, feedback, seen_segments, seen_feedback = transcript_stats.updates_since(cursor["segments"], cursor["feedback"])
+        cursor.update(segments=seen_segments, feedback=seen_feedback)
+        visual_confidence = (session.confident_count / session.total_frames * 100) if session.total_frames > 0 else 0
+        fields = {
+            "running": session.running,
+            "frames_analyzed": session.total_frames,
+            "visual_confidence": round(visual_confidence, 2),
+            "speech_length": transcript_stats.token_count,
+            "filler_words": transcript_stats.filler_summary(),
+            "time_remaining": round(session.time_left()),
+        }
+        return fields, {"speech_segments": segments, "speech_feedback": feedback}
+
+    return snapshot
+
+# Server-Sent Events replacing /status polling: the token is checked once when
+# the stream opens (Authorization header or ?token, as EventSource cannot set
+# headers), then only changed fields are pushed until the analysis ends
+@app.route('/status/stream', methods=['GET'])
+def status_stream():
+    logger.debug("Opening status stream")
+    auth_header = request.headers.get('Authorization')
+    token = None
+    if auth_header and auth_header.startswith('Bearer '):
+        token = auth_header.split(" ")[1]
+    elif 'token' in request.args:
+        token = request.args.get('token')
+    else:
+        logger.error("Missing token in Authorization header or query parameter")
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+
+    token_response = validate_token(token)
+    if not token_response.get("success"):
+        logger.error(f"Token validation failed: {token_response.get('message')}")
+        return jsonify({"success": False, "message": token_response.get("message", "Invalid token")}), 401
+
+    user_id = token_response.get("user").get("id")
+    session = sessions.get(user_id)
+    if not session:
+        return jsonify({"success": False, "message": "No analysis session"}), 404
+
+    stream = StatusStream(status_snapshot(session), interval=STATUS_STREAM_INTERVAL, heartbeat=STATUS_STREAM_HEARTBEAT)
+    return Response(stream.events(), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return jsonify({
+        "success": True,
+        "metrics": {
+            "auth": token_validator.stats(),
+            "db": db_pool.stats(),
+            "write_behind": results_writer.stats() if results_writer else None,
+            "sessions": sessions.stats(),
+            "devices": {"camera": camera.stats(), "microphone": microphone.stats()}
+        }
     })
 
 @app.route('/reports', methods=['GET'])
@@ -480,19 +619,43 @@ def reports():
     logger.debug(f"Authenticated user_id: {user_id}")
 
     try:
-        cursor = db.cursor()
-        cursor.execute(
-            'SELECT id, confident_percentage, visual_confidence, verbal_confidence, overall_confidence, transcribed_speech, filler_words, timestamp '
-            'FROM emotion_results WHERE user_id = %s ORDER BY timestamp DESC',
-            (user_id,)
-        )
-        results = cursor.fetchall()
+        page = parse_page_request(request.args, REPORT_COLUMNS, 'timestamp')
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    try:
+        results, next_cursor = fetch_page(db_pool, 'emotion_results', 'timestamp', user_id, page)
         logger.info(f"Retrieved {len(results)} reports for user_id: {user_id}")
-        return jsonify({"success": True, "reports": results})
+        return paged_response(jsonify({"success": True, "reports": results, "next_cursor": next_cursor}), request, next_cursor)
     except Exception as e:
         logger.error(f"Failed to fetch reports: {e}")
         return jsonify({"success": False, "message": "Failed to fetch reports"}), 500
 
+@app.route('/reports/summary', methods=['GET'])
+def reports_summary():
+    logger.debug("Received request for /reports/summary")
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        logger.error("Missing or invalid Authorization header")
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+
+    token = auth_header.split(" ")[1]
+    token_response = validate_token(token)
+    if not token_response.get("success"):
+        logger.error(f"Token validation failed: {token_response.get('message')}")
+        return jsonify({"success": False, "message": token_response.get("message", "Invalid token")}), 401
+
+    user = token_response.get("user")
+    user_id = user.get("id")
+    logger.debug(f"Authenticated user_id: {user_id}")
+
+    try:
+        summary = read_summary(db_pool, user_id)
+        return jsonify({"success": True, "summary": summary})
+    except Exception as e:
+        logger.error(f"Failed to fetch report summary: {e}")
+        return jsonify({"success": False, "message": "Failed to fetch report summary"}), 500
+
 if __name__ == '__main__':
     logger.info("Starting Flask server on port 5002")
     app.run(debug=True, port=5002)
\ No newline at end of file
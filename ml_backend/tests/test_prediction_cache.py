@@ -0,0 +1,45 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.prediction_cache import FacePredictionCache
+
+BOX_A = (10, 10, 50, 50)
+BOX_B = (200, 10, 50, 50)
+
+
+def crop(value):
+    return np.full((48, 48), value, dtype=np.uint8)
+
+
+def counting_infer(calls):
+    def infer(face):
+        calls.append(int(face[0, 0]))
+        return "Confident", 0.9
+    return infer
+
+
+def test_reuses_prediction_for_unchanged_face():
+    cache = FacePredictionCache(threshold=3.0, max_age=10)
+    calls = []
+    cache.predict(crop(100), BOX_A, counting_infer(calls))
+    cache.predict(crop(101), BOX_A, counting_infer(calls))
+    assert calls == [100]
+    assert cache.stats()["cache_hits"] == 1
+
+
+def test_misses_with_several_cached_faces():
+    cache = FacePredictionCache(threshold=3.0, max_age=10)
+    calls = []
+    infer = counting_infer(calls)
+    cache.predict(crop(100), BOX_A, infer)
+    cache.predict(crop(150), BOX_B, infer)
+    # Changed crops for B replace B's entry and leave A's alone
+    cache.predict(crop(50), BOX_B, infer)
+    cache.predict(crop(10), BOX_B, infer)
+    cache.predict(crop(100), BOX_A, infer)
+    assert calls == [100, 150, 50, 10]
+    assert len(cache.faces) == 2
+    assert sorted(face["box"] for face in cache.faces) == [BOX_A, BOX_B]
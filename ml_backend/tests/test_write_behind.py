@@ -0,0 +1,45 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.write_behind import WriteBehindWriter
+
+
+# Pool whose connection() blocks until released, like a database that stopped answering
+class HangingPool:
+    def __init__(self):
+        self.release = threading.Event()
+
+    @contextmanager
+    def connection(self):
+        self.release.wait()
+        raise ConnectionError("database unavailable")
+        yield
+
+
+def test_close_returns_and_spools_queue_when_database_hangs(tmp_path):
+    pool = HangingPool()
+    spool_path = str(tmp_path / "rows.jsonl")
+    writer = WriteBehindWriter(pool, "INSERT", batch_size=1, flush_interval=0.01, max_queue=3, spool_path=spool_path)
+    try:
+        writer.submit((0,))
+        while not writer.queue.empty():
+            time.sleep(0.01)
+        for i in range(1, 4):
+            writer.submit((i,))
+        assert writer.queue.full()
+
+        started = time.monotonic()
+        writer.close(timeout=0.2)
+        assert time.monotonic() - started < 2
+
+        with open(spool_path) as f:
+            assert [json.loads(line) for line in f] == [[1], [2], [3]]
+        assert writer.stats()["dropped"] == 0
+    finally:
+        pool.release.set()
+        writer.thread.join(2)
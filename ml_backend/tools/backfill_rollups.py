@@ -0,0 +1,27 @@
+"""Rebuild the report_rollups table from analysis_results, audio_results and emotion_results.
+
+Usage: python tools/backfill_rollups.py [--user-id ID] [--source upload|audio|webcam ...]
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.db import pool_from_env
+from common.rollups import ROLLUP_SOURCES, rebuild_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--user-id', type=int)
+    parser.add_argument('--source', choices=sorted(ROLLUP_SOURCES), nargs='+', default=list(ROLLUP_SOURCES))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    rebuilt = rebuild_rollups(pool_from_env(), user_id=args.user_id, sources=args.source)
+    print(f"Rebuilt {rebuilt} rollup rows")
+
+
+if __name__ == '__main__':
+    main()
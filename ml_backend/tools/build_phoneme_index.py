@@ -0,0 +1,28 @@
+"""Compile NLTK's CMU Pronouncing Dictionary into the memory-mapped phoneme-count index.
+
+Requires CMUdict in the NLTK data directory (tools/provision_nltk_data.py --resource cmudict).
+
+Usage: python tools/build_phoneme_index.py [--output data/cmudict_phonemes.idx]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.phonemes import DEFAULT_INDEX_PATH, build_from_cmudict
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default=os.environ.get('PHONEME_INDEX', DEFAULT_INDEX_PATH))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    words = build_from_cmudict(args.output)
+    print(f"Wrote {words} words to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
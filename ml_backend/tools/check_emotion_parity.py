@@ -0,0 +1,50 @@
+"""Check that an alternative emotion backend matches the Keras model on a fixture set of face crops.
+
+Compares class probabilities (max absolute difference against --atol) and the
+Confident / Not Confident labels of both services; exits non-zero on a mismatch.
+
+Usage: python tools/check_emotion_parity.py --fixtures faces/ [--backend numpy] [--atol 1e-4]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.emotion import SERVICE_LABEL_RULES, label_from_preds, load_face_crops
+from common.inference import BACKENDS, EMOTION_MODEL_PATHS, load_emotion_backend
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', required=True, help='.npy array of grayscale crops or a directory of face images')
+    parser.add_argument('--backend', choices=sorted(set(BACKENDS) - {'keras', 'int8'}), default='numpy')
+    parser.add_argument('--model', help='model file for --backend (default: its EMOTION_MODEL_PATHS entry)')
+    parser.add_argument('--reference', default=EMOTION_MODEL_PATHS['keras'])
+    parser.add_argument('--atol', type=float, default=1e-4)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    faces = load_face_crops(args.fixtures)
+    reference = load_emotion_backend('keras', args.reference)
+    candidate = load_emotion_backend(args.backend, args.model)
+
+    expected = np.concatenate([reference.predict_on_batch(faces[i:i + args.batch_size]) for i in range(0, len(faces), args.batch_size)])
+    actual = np.concatenate([candidate.predict_on_batch(faces[i:i + args.batch_size]) for i in range(0, len(faces), args.batch_size)])
+
+    diff = np.abs(expected - actual).max(axis=1)
+    print(f"{len(faces)} fixtures, max |diff| {diff.max():.2e}, mean {diff.mean():.2e}, tolerance {args.atol:.0e}")
+    ok = bool(diff.max() <= args.atol)
+    for service, (confident_classes, not_confident_class) in SERVICE_LABEL_RULES.items():
+        mismatched = [
+            i for i in range(len(faces))
+            if label_from_preds(expected[i], confident_classes, not_confident_class)[0] != label_from_preds(actual[i], confident_classes, not_confident_class)[0]
+        ]
+        print(f"{service} labels: {len(faces) - len(mismatched)}/{len(faces)} agree" + (f" (mismatched fixtures {mismatched[:10]})" if mismatched else ""))
+        ok = ok and not mismatched
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
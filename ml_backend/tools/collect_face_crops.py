@@ -0,0 +1,42 @@
+"""Collect 48x48 grayscale face crops from videos, as detect_emotions sees them, for calibration and fixtures.
+
+Usage: python tools/collect_face_crops.py video1.mp4 [video2.mp4 ...] --output crops.npy [--sample-fps 3] [--limit 2000]
+"""
+import argparse
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.emotion import iter_face_crops
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('videos', nargs='+')
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--sample-fps', type=float, default=3.0)
+    parser.add_argument('--limit', type=int, default=2000)
+    args = parser.parse_args()
+
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    crops = []
+    for video in args.videos:
+        found = 0
+        for crop in iter_face_crops(video, cascade, args.sample_fps):
+            if len(crops) >= args.limit:
+                break
+            crops.append(crop)
+            found += 1
+        print(f"{video}: {found} crops")
+    if not crops:
+        print("No faces found")
+        sys.exit(1)
+    np.save(args.output, np.stack(crops))
+    print(f"Wrote {len(crops)} crops to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Compare Confident / Not Confident labels of the float and int8 emotion models on a labelled fixture set.
+
+Reports per-service label agreement, accuracy against the fixture labels and the
+per-face / batched speedup, and writes the report next to the int8 model. The
+services only enable EMOTION_BACKEND=int8 when that report shows agreement of at
+least EMOTION_INT8_MIN_AGREEMENT for the exact model file.
+
+Usage: python tools/evaluate_int8_model.py --fixtures faces.npy --labels labels.json [--min-agreement 0.98]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.emotion import SERVICE_LABEL_RULES, label_from_preds, load_face_crops
+from common.inference import (
+    EMOTION_MODEL_PATHS, INT8_MIN_AGREEMENT, Int8Backend, file_sha256, load_emotion_backend, quantization_report_path
+)
+
+
+# Per-face predictions, one call per face as predict_emotion makes them
+def predict_faces(backend, faces):
+    start = time.perf_counter()
+    preds = np.concatenate([backend.predict_on_batch(face[np.newaxis]) for face in faces])
+    return preds, (time.perf_counter() - start) / len(faces)
+
+
+def batched_seconds(backend, faces, batch_size, repeat=3):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for i in range(0, len(faces), batch_size):
+            backend.predict_on_batch(faces[i:i + batch_size])
+    return (time.perf_counter() - start) / (repeat * len(faces))
+
+
+# Fixture labels: a JSON list of "Confident" / "Not Confident" shared by both
+# services, or {"upload": [...], "webcam": [...]}
+def load_labels(path, count):
+    with open(path) as f:
+        labels = json.load(f)
+    if isinstance(labels, list):
+        labels = {service: labels for service in SERVICE_LABEL_RULES}
+    for service, values in labels.items():
+        if len(values) != count:
+            raise ValueError(f"{path}: {len(values)} {service} labels for {count} fixtures")
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', required=True, help='.npy array of grayscale crops or a directory of face images')
+    parser.add_argument('--labels', required=True, help='JSON labels aligned with the fixtures')
+    parser.add_argument('--model', default=EMOTION_MODEL_PATHS['keras'])
+    parser.add_argument('--int8-model', default=EMOTION_MODEL_PATHS['int8'])
+    parser.add_argument('--min-agreement', type=float, default=INT8_MIN_AGREEMENT)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    faces = load_face_crops(args.fixtures)
+    labels = load_labels(args.labels, len(faces))
+    float_model = load_emotion_backend('keras', args.model)
+    int8_model = Int8Backend(args.int8_model, gated=False)
+
+    # Warm both models up before timing
+    float_model.predict_on_batch(faces[:1])
+    int8_model.predict_on_batch(faces[:1])
+    float_preds, float_face_seconds = predict_faces(float_model, faces)
+    int8_preds, int8_face_seconds = predict_faces(int8_model, faces)
+    float_batch_seconds = batched_seconds(float_model, faces, args.batch_size)
+    int8_batch_seconds = batched_seconds(int8_model, faces, args.batch_size)
+
+    report = {
+        'model_sha256': file_sha256(args.int8_model),
+        'float_model': os.path.abspath(args.model),
+        'fixtures': len(faces),
+        'agreement': {},
+        'accuracy': {},
+        'speedup': {
+            'per_face': float_face_seconds / int8_face_seconds,
+            f'batch{args.batch_size}': float_batch_seconds / int8_batch_seconds,
+        },
+        'min_agreement': args.min_agreement,
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    print(f"{len(faces)} fixtures")
+    for service, (confident_classes, not_confident_class) in SERVICE_LABEL_RULES.items():
+        float_labels = [label_from_preds(row, confident_classes, not_confident_class)[0] for row in float_preds]
+        int8_labels = [label_from_preds(row, confident_classes, not_confident_class)[0] for row in int8_preds]
+        agreement = sum(a == b for a, b in zip(float_labels, int8_labels)) / len(faces)
+        report['agreement'][service] = agreement
+        float_accuracy = sum(a == b for a, b in zip(float_labels, labels[service])) / len(faces)
+        int8_accuracy = sum(a == b for a, b in zip(int8_labels, labels[service])) / len(faces)
+        report['accuracy'][service] = {'float': float_accuracy, 'int8': int8_accuracy}
+        print(f"{service}: label agreement {agreement:.3f}, accuracy float {float_accuracy:.3f} / int8 {int8_accuracy:.3f}")
+    print(f"per-face: float {float_face_seconds * 1000:.2f} ms, int8 {int8_face_seconds * 1000:.2f} ms "
+          f"({report['speedup']['per_face']:.2f}x)")
+    print(f"batch {args.batch_size}: float {float_batch_seconds * 1000:.3f} ms/face, int8 {int8_batch_seconds * 1000:.3f} ms/face "
+          f"({report['speedup'][f'batch{args.batch_size}']:.2f}x)")
+
+    report_path = quantization_report_path(args.int8_model)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    passed = min(report['agreement'].values()) >= args.min_agreement
+    print(f"Wrote {report_path}: {'PASS' if passed else 'FAIL'} (minimum agreement {args.min_agreement:.3f})")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
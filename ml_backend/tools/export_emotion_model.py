@@ -0,0 +1,31 @@
+"""Convert emotion_classifier.h5 into the .npz weights run by the NumPy inference backend.
+
+Needs TensorFlow/Keras once, at conversion time; services with EMOTION_BACKEND=numpy do not.
+
+Usage: python tools/export_emotion_model.py [--model emotion_classifier.h5] [--output emotion_classifier.npz]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.inference import EMOTION_MODEL_PATHS, export_numpy_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default=EMOTION_MODEL_PATHS['keras'])
+    parser.add_argument('--output', default=EMOTION_MODEL_PATHS['numpy'])
+    args = parser.parse_args()
+
+    from keras.models import load_model
+    model = load_model(args.model, compile=False)
+    spec = export_numpy_model(model, args.output)
+    for layer in spec:
+        print(f"  {layer['type']}" + (f" ({layer['activation']})" if 'activation' in layer else ""))
+    print(f"Wrote {len(spec)} layers to {args.output} ({os.path.getsize(args.output) / 1024:.0f} KiB)")
+    print("Check it with tools/check_emotion_parity.py before setting EMOTION_BACKEND=numpy")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Download the NLTK data the services need into the vendored nltk_data directory.
+
+Run once at build/deploy time; the services only read from this directory and never download.
+
+Usage: python tools/provision_nltk_data.py [--dir nltk_data] [--resource punkt ...]
+"""
+import argparse
+import os
+import sys
+
+import nltk
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.startup import NLTK_DATA_DIR, NLTK_RESOURCES
+
+# Downloader package names for each resource the services check for
+PACKAGES = {
+    'punkt': ('punkt', 'punkt_tab'),
+    'cmudict': ('cmudict',),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dir', default=NLTK_DATA_DIR)
+    parser.add_argument('--resource', choices=sorted(NLTK_RESOURCES), nargs='+', default=sorted(NLTK_RESOURCES))
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    failed = []
+    for resource in args.resource:
+        for package in PACKAGES[resource]:
+            if not nltk.download(package, download_dir=args.dir, quiet=True, raise_on_error=False):
+                failed.append(package)
+    if failed:
+        print(f"Failed to download: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"NLTK data ready in {args.dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Build the post-training int8 variant of emotion_classifier.h5, calibrated on real face crops.
+
+Calibration crops come from tools/collect_face_crops.py. The model is not used by the
+services until tools/evaluate_int8_model.py has written a passing report for it.
+
+Usage: python tools/quantize_emotion_model.py --calibration crops.npy [--model emotion_classifier.h5] [--output emotion_classifier_int8.tflite]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.emotion import load_face_crops
+from common.inference import EMOTION_MODEL_PATHS, export_int8_model, quantization_report_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calibration', required=True, help='.npy array of grayscale crops or a directory of face images')
+    parser.add_argument('--model', default=EMOTION_MODEL_PATHS['keras'])
+    parser.add_argument('--output', default=EMOTION_MODEL_PATHS['int8'])
+    parser.add_argument('--limit', type=int, default=500, help='calibration crops used')
+    args = parser.parse_args()
+
+    from keras.models import load_model
+    calibration = load_face_crops(args.calibration, limit=args.limit)
+    size = export_int8_model(load_model(args.model, compile=False), calibration, args.output)
+    # A rebuilt model invalidates any earlier evaluation
+    report_path = quantization_report_path(args.output)
+    if os.path.exists(report_path):
+        os.remove(report_path)
+    print(f"Wrote {args.output} ({size / 1024:.0f} KiB) calibrated on {len(calibration)} crops")
+    print("Run tools/evaluate_int8_model.py before setting EMOTION_BACKEND=int8")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,185 +6,236 @@ import cv2
 import numpy as np
 import speech_recognition as sr
 import re
-import moviepy.editor as mp
-from nltk.corpus import cmudict
 from nltk.tokenize import word_tokenize
-from keras.models import load_model
-import pymysql
-import requests
 import logging
-import nltk
-from functools import lru_cache
 from werkzeug.utils import secure_filename
 import time
-
-nltk.download('cmudict')
-nltk.download('punkt')
+import sys
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ThreadPoolExecutor, wait
+
+# Make the shared ml_backend modules importable when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.auth import token_validator_from_env
+from common.db import pool_from_env
+from common.reports import fetch_page, paged_response, parse_page_request
+from common.rollups import Rollup, read_summary
+from common.write_behind import writer_from_env
+from common.phonemes import load_phoneme_index
+from common.inference import load_emotion_backend
+from common.startup import LazyResource, Readiness
+from common.audio import AudioDecodeError, decode_audio, duration_seconds
+from common.emotion import EmotionBatcher, label_from_preds
+from common.face_tracker import FaceLocator
+from common.frame_sampler import FrameSampler
+from common.segmenter import recognize_google, transcribe_chunks
+from common.jobs import JobQueue, QueueFullError
+from common.result_cache import ResultCache, UploadTooLargeError, save_and_hash
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}})
+CORS(app, resources={r"/*": {"origins": "http://localhost:3000"}}, expose_headers=["ETag", "Link", "X-Next-Cursor"])
 
-# MySQL Configuration
+# MySQL connection pool; each DB call checks out its own connection. An
+# unreachable database only fails /readyz and the calls that need it.
+db_pool = pool_from_env()
 try:
-    db = pymysql.connect(
-        host='localhost',
-        user='root',
-        password='',
-        database='confidence_speaker',
-        cursorclass=pymysql.cursors.DictCursor
-    )
+    with db_pool.connection():
+        pass
     logger.info("MySQL connection established")
 except Exception as e:
     logger.error(f"Failed to connect to MySQL: {e}")
-    raise
 
-# Load CMU Pronouncing Dictionary
-cmu_dict = cmudict.dict()
+# Results insert; the timestamp is bound explicitly so queued or spooled rows keep their original time
+INSERT_ANALYSIS_SQL = (
+    'INSERT INTO analysis_results (user_id, pronunciation_assessment, suggestion, most_repeated_words, filler_words, confident_percentage, not_confident_percentage, created_at) '
+    'VALUES (%s, %s, %s, %s, %s, %s, %s, %s)'
+)
+# Per-user report rollups updated with every insert (see /reports/summary)
+results_rollup = Rollup('upload', user_column=0, filler_column=4, time_column=7, confident_column=5)
+# Optional write-behind writer (WRITE_BEHIND=1); None means inserts happen on the request path
+results_writer = writer_from_env(db_pool, INSERT_ANALYSIS_SQL, 'analysis_results', on_batch=results_rollup.apply)
+
+# Columns served by /reports; `fields` / `exclude` select a subset
+REPORT_COLUMNS = [
+    'id',
+    'user_id',
+    'pronunciation_assessment',
+    'suggestion',
+    'most_repeated_words',
+    'filler_words',
+    'confident_percentage',
+    'not_confident_percentage',
+    'created_at',
+]
+
+# Memory-mapped phoneme counts compiled from CMUdict (tools/build_phoneme_index.py)
+phoneme_index = LazyResource('phoneme_index', load_phoneme_index)
 
 # Common filler words
 FILLER_WORDS = {'um', 'uh', 'like', 'you know', 'so', 'basically', 'actually'}
 
-# Cache CMUdict lookups
-@lru_cache(maxsize=10000)
-def get_phonemes(word):
-    return cmu_dict.get(word.lower(), [[]])[0]
-
-# Load emotion model
-try:
-    emotion_model = load_model('./emotion_classifier.h5')
-    logger.info("Emotion model loaded successfully")
-except Exception as e:
-    logger.error(f"Failed to load emotion model: {e}")
-    raise
-
-# Load Haar cascade
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-if face_cascade.empty():
-    logger.error("Failed to load Haar cascade")
-    raise Exception("Haar cascade not found")
+# Emotion model on the engine chosen by EMOTION_BACKEND (keras, numpy or int8, see
+# common/inference.py); TensorFlow is only imported by the keras backend
+emotion_model = LazyResource('emotion_model', load_emotion_backend)
+
+# Emotion classes counted as confident vs not confident
+CONFIDENT_CLASSES = (1, 3, 4)  # Happy + Surprised + Neutral
+NOT_CONFIDENT_CLASS = 2  # Sad
+
+# Number of face crops sent to the emotion model per call (1 = per-face path)
+EMOTION_BATCH_SIZE = int(os.environ.get('EMOTION_BATCH_SIZE', 32))
+
+# Analysed frames per second of video; overridable per request via `sample_fps`
+DEFAULT_SAMPLE_FPS = float(os.environ.get('SAMPLE_FPS', 3.0))
+MAX_SAMPLE_FPS = 30.0
+
+# Bounded pool shared by all requests for the transcription / facial analysis stages
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', 4))
+ANALYSIS_TIMEOUT = float(os.environ.get('ANALYSIS_TIMEOUT', 240))
+analysis_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix='analysis')
+
+# Speech chunks recognised in parallel across all requests; recognize_speech
+# takes an sr.AudioData and returns text, so it can be swapped for a local stand-in
+TRANSCRIBE_CONCURRENCY = int(os.environ.get('TRANSCRIBE_CONCURRENCY', 4))
+transcription_executor = ThreadPoolExecutor(max_workers=TRANSCRIBE_CONCURRENCY, thread_name_prefix='transcribe')
+recognize_speech = recognize_google
+
+# Background jobs for /index?async=1; finished results are kept for JOB_RESULT_TTL seconds
+INDEX_ASYNC = os.environ.get('INDEX_ASYNC', '0')
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_RESULT_TTL = int(os.environ.get('JOB_RESULT_TTL', 3600))
+job_queue = JobQueue(workers=JOB_WORKERS, result_ttl=JOB_RESULT_TTL, max_pending=int(os.environ.get('JOB_MAX_PENDING', 100)))
+
+# Results of previous analyses keyed by upload SHA-256; bump ANALYSIS_VERSION
+# whenever a change to the pipeline would alter results for the same file
+ANALYSIS_VERSION = "4"
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('RESULT_CACHE_SIZE', 256)),
+    persist_dir=os.environ.get('RESULT_CACHE_DIR') or None
+)
+
+# Haar cascade
+def load_face_cascade():
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    if cascade.empty():
+        raise Exception("Haar cascade not found")
+    return cascade
+
+face_cascade = LazyResource('face_cascade', load_face_cascade)
+
+# /healthz and /readyz; models load in a warmup thread unless MODEL_LOADING says otherwise
+readiness = Readiness(db_pool, resources=[emotion_model, face_cascade, phoneme_index])
+readiness.register(app)
+readiness.warm_up()
 
 # File upload config
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'wav', 'mp3', 'mp4', 'avi', 'mkv'}
 MAX_SIZE = 50 * 1024 * 1024  # 50MB
+MAX_VIDEO_SECONDS = 300  # 5 minutes
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-# Validate token
+# Validate token (pooled connection to the auth service, short-lived cache)
+token_validator = token_validator_from_env()
+
 def validate_token(token):
-    try:
-        response = requests.post(
-            "http://localhost:3003/api/auth/validate-token",
-            json={"token": token},
-            timeout=5
-        )
-        return response.json()
-    except requests.RequestException as e:
-        logger.error(f"Token validation failed: {e}")
-        return {"success": False, "message": str(e)}
+    return token_validator.validate(token)
 
-# Transcribe audio
-def transcribe_audio(file_path):
-    recognizer = sr.Recognizer()
+# Decode any supported upload in memory, split it at pauses and transcribe
+# the chunks concurrently. Returns {"text", "segments"} on success.
+def transcribe_media(file_path, media_label, max_seconds=None, recognize=None, cancel_event=None):
     try:
-        with sr.AudioFile(file_path) as source:
-            audio_data = recognizer.record(source)
-        text = recognizer.recognize_google(audio_data)
-        logger.info("Audio transcription successful")
-        return text, 200
+        samples = decode_audio(file_path, max_seconds=max_seconds)
+        if max_seconds and duration_seconds(samples) > max_seconds:
+            logger.error(f"{media_label.capitalize()} duration exceeds {max_seconds} seconds")
+            return {"error": f"{media_label.capitalize()} too long. Maximum duration is 5 minutes."}, 400
+        text, segments = transcribe_chunks(samples, transcription_executor, recognize or recognize_speech, cancel_event=cancel_event)
+        logger.info(f"{media_label.capitalize()} transcription successful ({len(segments)} segments)")
+        return {"text": text, "segments": segments}, 200
+    except CancelledError:
+        logger.info(f"{media_label.capitalize()} transcription cancelled")
+        return {"error": f"{media_label.capitalize()} transcription cancelled"}, 503
+    except AudioDecodeError as e:
+        logger.error(f"Failed to decode {media_label}: {e}")
+        return {"error": f"Could not read the {media_label} file's audio."}, 400
     except sr.RequestError as e:
         logger.error(f"Google Speech API error: {e}")
         return {"error": f"Speech API error: {str(e)}"}, 504
     except sr.UnknownValueError:
         logger.error("Could not understand audio")
-        return {"error": "Could not understand audio. Please ensure the audio is clear."}, 400
+        hint = "the audio is clear" if media_label == "audio" else f"the {media_label} has clear audio"
+        return {"error": f"Could not understand audio. Please ensure {hint}."}, 400
     except Exception as e:
-        logger.error(f"Audio transcription failed: {e}")
-        return {"error": f"Audio transcription failed: {str(e)}"}, 400
+        logger.error(f"{media_label.capitalize()} transcription failed: {e}")
+        return {"error": f"{media_label.capitalize()} transcription failed: {str(e)}"}, 400
+
+# Transcribe audio
+def transcribe_audio(file_path):
+    return transcribe_media(file_path, "audio")
 
 # Transcribe video
-def transcribe_video(file_path):
-    recognizer = sr.Recognizer()
-    temp_audio_file = os.path.join(app.config['UPLOAD_FOLDER'], 'temp_audio.wav')
-    video_clip = None
-    audio_clip = None
-    try:
-        video_clip = mp.VideoFileClip(file_path)
-        if video_clip.duration > 300:  # 5 minutes max
-            logger.error("Video duration exceeds 5 minutes")
-            return {"error": "Video too long. Maximum duration is 5 minutes."}, 400
-        audio_clip = video_clip.audio
-        audio_clip.write_audiofile(temp_audio_file, logger=None)
-        with sr.AudioFile(temp_audio_file) as source:
-            audio_data = recognizer.record(source)
-        text = recognizer.recognize_google(audio_data)
-        logger.info("Video transcription successful")
-        return text, 200
-    except sr.RequestError as e:
-        logger.error(f"Google Speech API error: {e}")
-        return {"error": f"Speech API error: {str(e)}"}, 504
-    except sr.UnknownValueError:
-        logger.error("Could not understand audio")
-        return {"error": "Could not understand audio. Please ensure the video has clear audio."}, 400
-    except Exception as e:
-        logger.error(f"Video transcription failed: {e}")
-        return {"error": f"Video transcription failed: {str(e)}"}, 400
-    finally:
-        if audio_clip:
-            audio_clip.close()
-        if video_clip:
-            video_clip.close()
-        if os.path.exists(temp_audio_file):
-            try:
-                os.remove(temp_audio_file)
-            except Exception as e:
-                logger.warning(f"Failed to delete temp audio: {e}")
+def transcribe_video(file_path, cancel_event=None):
+    return transcribe_media(file_path, "video", max_seconds=MAX_VIDEO_SECONDS, cancel_event=cancel_event)
 
-# Detect emotions
-def detect_emotions(video_file):
+# Detect emotions; a failure is raised so the transcription stage can be cancelled
+def detect_emotions(video_file, sample_fps=DEFAULT_SAMPLE_FPS, batch_size=EMOTION_BATCH_SIZE, cancel_event=None):
     cap = None
     try:
         cap = cv2.VideoCapture(video_file)
         if not cap.isOpened():
             logger.warning("Could not open video file for emotion detection")
-            return 0, 0
+            return 0, 0, None
+        batcher = EmotionBatcher(emotion_model.get(), batch_size, CONFIDENT_CLASSES, NOT_CONFIDENT_CLASS) if batch_size > 1 else None
+        face_cascade.get()
+        # CascadeClassifier is not safe to share between threads; concurrent analyses each load their own
+        locator = FaceLocator(load_face_cascade())
+        sampler = FrameSampler(cap, sample_fps)
         confident_count = 0
         not_confident_count = 0
-        total_frames = 0
-        frame_skip = 10
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-            total_frames += 1
-            if total_frames % frame_skip != 0:
-                continue
+        start_time = time.perf_counter()
+        for _, frame in sampler:
+            if cancel_event and cancel_event.is_set():
+                logger.info("Emotion detection cancelled")
+                return 0, 0, None
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+            faces = locator.locate(gray)
             if len(faces) == 0:
                 continue
             for (x, y, w, h) in faces:
+                # The batch gets the BGR crop rather than a slice of `gray`: converting
+                # after the resize, as predict_emotion does, keeps both paths' inputs identical
                 face_roi = frame[y:y+h, x:x+w]
+                if batcher:
+                    batcher.add(face_roi)
+                    continue
                 emotion_label, _ = predict_emotion(face_roi)
                 if emotion_label == "Confident":
                     confident_count += 1
                 elif emotion_label == "Not Confident":
                     not_confident_count += 1
-        processed_frames = total_frames // frame_skip
+        if batcher:
+            batcher.flush()
+            confident_count = batcher.counts["Confident"]
+            not_confident_count = batcher.counts["Not Confident"]
+            logger.debug(f"Emotion inference: {batcher.faces} faces in {batcher.batches} batches")
+        sampling = sampler.stats(time.perf_counter() - start_time)
+        processed_frames = sampler.processed_frames
         confident_percentage = min((confident_count / processed_frames) * 100, 100) if processed_frames else 0
         not_confident_percentage = (not_confident_count / processed_frames) * 100 if processed_frames else 0
-        logger.info(f"Emotion detection: Confident {confident_percentage}%, Not Confident {not_confident_percentage}%")
-        return confident_percentage, not_confident_percentage
+        logger.info(f"Emotion detection: Confident {confident_percentage}%, Not Confident {not_confident_percentage}%, sampling {sampling}")
+        return confident_percentage, not_confident_percentage, sampling
     except Exception as e:
         logger.error(f"Emotion detection failed: {e}")
-        return 0, 0
+        raise
     finally:
         if cap and cap.isOpened():
             cap.release()
@@ -198,11 +249,8 @@ def predict_emotion(face_roi):
         face_roi = face_roi.astype("float") / 255.0
         face_roi = np.expand_dims(face_roi, axis=0)
         face_roi = np.expand_dims(face_roi, axis=-1)
-        preds = emotion_model.predict(face_roi, verbose=0)[0]
-        confident_score = preds[1] + preds[3] + preds[4]  # Happy + Surprised + Neutral
-        not_confident_score = preds[2]  # Sad
-        emotion_label = "Confident" if confident_score > not_confident_score else "Not Confident"
-        return emotion_label, max(confident_score, not_confident_score)
+        preds = emotion_model.get().predict_on_batch(face_roi)[0]
+        return label_from_preds(preds, CONFIDENT_CLASSES, NOT_CONFIDENT_CLASS)
     except Exception as e:
         logger.error(f"Emotion prediction failed: {e}")
         raise
@@ -214,15 +262,15 @@ def assess_pronunciation(text):
             logger.error("Invalid text for pronunciation assessment")
             return "Unknown vocabulary"
         for word in process_text(text):
-            phonemes = get_phonemes(word)
-            if phonemes:
-                if len(phonemes) <= 1:
+            phoneme_count = phoneme_index.get().phoneme_count(word)
+            if phoneme_count:
+                if phoneme_count <= 1:
                     return "Excellent vocabulary"
-                elif len(phonemes) <= 2:
+                elif phoneme_count <= 2:
                     return "Good vocabulary"
-                elif len(phonemes) <= 3:
+                elif phoneme_count <= 3:
                     return "Okay vocabulary"
-                elif len(phonemes) <= 4:
+                elif phoneme_count <= 4:
                     return "Bad vocabulary"
                 else:
                     return "Poor vocabulary"
@@ -262,34 +310,93 @@ def process_text(text):
 
 # Store results
 def store_analysis_results(user_id, pronunciation_assessment, suggestion, most_repeated_words, filler_words, confident_percentage, not_confident_percentage):
+    created_at = time.strftime('%Y-%m-%d %H:%M:%S')
+    row = (user_id, pronunciation_assessment, suggestion, most_repeated_words, filler_words, confident_percentage, not_confident_percentage, created_at)
+    if results_writer:
+        results_writer.submit(row)
+        return
     try:
-        cursor = db.cursor()
-        cursor.execute(
-            'INSERT INTO analysis_results (user_id, pronunciation_assessment, suggestion, most_repeated_words, filler_words, confident_percentage, not_confident_percentage, created_at) '
-            'VALUES (%s, %s, %s, %s, %s, %s, %s, NOW())',
-            (user_id, pronunciation_assessment, suggestion, most_repeated_words, filler_words, confident_percentage, not_confident_percentage)
-        )
-        db.commit()
+        with db_pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(INSERT_ANALYSIS_SQL, row)
+                results_rollup.apply(cursor, [row])
+            conn.commit()
         logger.info("Analysis results stored in database")
     except Exception as e:
         logger.error(f"Failed to store analysis results: {e}")
-        db.rollback()
+
+# Run one analysis stage and record its wall-clock time
+def timed_stage(timings, name, func, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        timings[name] = round(time.perf_counter() - start, 3)
+
+# Run transcription and facial analysis of a video in parallel; whichever
+# stage fails first cancels the other
+def analyze_video_stages(file_path, sample_fps, timings):
+    cancel_event = threading.Event()
+    transcript_future = analysis_executor.submit(timed_stage, timings, "transcription", transcribe_video, file_path, cancel_event=cancel_event)
+    emotion_future = analysis_executor.submit(timed_stage, timings, "facial_analysis", detect_emotions, file_path, sample_fps, cancel_event=cancel_event)
+    deadline = time.monotonic() + ANALYSIS_TIMEOUT
+    pending = {transcript_future, emotion_future}
+    while pending:
+        done, pending = wait(pending, timeout=max(0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            logger.error(f"Media analysis timed out after {ANALYSIS_TIMEOUT}s")
+            cancel_event.set()
+            transcript_future.cancel()
+            emotion_future.cancel()
+            return ({"error": "Analysis timed out. Please try a shorter recording."}, 504), None
+        if emotion_future in done and emotion_future.exception():
+            cancel_event.set()
+            transcript_future.cancel()
+            return ({"error": f"Facial analysis failed: {emotion_future.exception()}"}, 500), None
+        if transcript_future in done and transcript_future.result()[1] != 200:
+            cancel_event.set()
+            emotion_future.cancel()
+            return transcript_future.result(), None
+    return transcript_future.result(), emotion_future.result()
+
+# Cache key for an upload's analysis; sampling rate only matters for video
+def result_cache_key(content_hash, file_path, sample_fps):
+    if file_path.endswith((".mp4", ".avi", ".mkv")):
+        return f"v{ANALYSIS_VERSION}:{content_hash}:{sample_fps:g}"
+    return f"v{ANALYSIS_VERSION}:{content_hash}"
+
+# Serve a cached analysis, still recording the run for this user. The stored
+# stage timings belong to the original run, so only this request's total is reported.
+def serve_cached_result(cached, user_id, start_time):
+    store_analysis_results(user_id, *cached["row"])
+    result = dict(cached["result"], cached=True, timings={"total": round(time.perf_counter() - start_time, 3)})
+    logger.info("Served analysis from result cache")
+    return result, 200
 
 # Analyze media
-def analyze_media(file_path, user_id):
+def analyze_media(file_path, user_id, sample_fps=DEFAULT_SAMPLE_FPS, content_hash=None, check_cache=True):
     words = []
+    sampling = None
+    timings = {}
+    start_time = time.perf_counter()
+    cache_key = result_cache_key(content_hash, file_path, sample_fps) if content_hash else None
     try:
+        cached = result_cache.get(cache_key) if cache_key and check_cache else None
+        if cached:
+            return serve_cached_result(cached, user_id, start_time)
         if file_path.endswith((".mp4", ".avi", ".mkv")):
-            text, status = transcribe_video(file_path)
+            (transcript, status), emotions = analyze_video_stages(file_path, sample_fps, timings)
             if status != 200:
-                return text, status
+                return transcript, status
+            text = transcript["text"]
             words = process_text(text)
             pronunciation_assessment = assess_pronunciation(text)
-            confident_percentage, not_confident_percentage = detect_emotions(file_path)
+            confident_percentage, not_confident_percentage, sampling = emotions
         elif file_path.endswith((".wav", ".mp3")):
-            text, status = transcribe_audio(file_path)
+            transcript, status = timed_stage(timings, "transcription", transcribe_audio, file_path)
             if status != 200:
-                return text, status
+                return transcript, status
+            text = transcript["text"]
             words = process_text(text)
             pronunciation_assessment = assess_pronunciation(text)
             confident_percentage, not_confident_percentage = None, None
@@ -300,8 +407,7 @@ def analyze_media(file_path, user_id):
         filler_words = find_filler_words(words)
         suggestions = get_suggestions(pronunciation_assessment)
 
-        store_analysis_results(
-            user_id,
+        row = (
             pronunciation_assessment,
             suggestions[0],
             most_repeated_words,
@@ -309,6 +415,7 @@ def analyze_media(file_path, user_id):
             confident_percentage,
             not_confident_percentage
         )
+        store_analysis_results(user_id, *row)
 
         result = {
             "transcribed_text": text,
@@ -317,13 +424,35 @@ def analyze_media(file_path, user_id):
             "filler_words": filler_words,
             "confident_percentage": f"{confident_percentage:.2f}%" if confident_percentage else "N/A",
             "not_confident_percentage": f"{not_confident_percentage:.2f}%" if not_confident_percentage else "N/A",
-            "suggestions": suggestions
+            "suggestions": suggestions,
+            "segments": transcript["segments"]
         }
+        if sampling:
+            result["frame_sampling"] = sampling
+        timings["total"] = round(time.perf_counter() - start_time, 3)
+        result["timings"] = timings
+        if cache_key:
+            result_cache.put(cache_key, {"result": result, "row": row})
         return result, 200
     except Exception as e:
         logger.error(f"Media analysis failed: {e}")
         return {"error": f"Analysis failed: {str(e)}"}, 500
 
+# Delete an uploaded file, retrying while another handle still holds it
+def remove_upload(file_path):
+    if file_path and os.path.exists(file_path):
+        for _ in range(3):  # Retry deletion
+            try:
+                os.remove(file_path)
+                logger.info(f"Deleted file: {file_path}")
+                break
+            except PermissionError:
+                logger.warning(f"Retrying file deletion: {file_path}")
+                time.sleep(0.5)
+            except Exception as e:
+                logger.error(f"Failed to delete file {file_path}: {e}")
+                break
+
 @app.route('/index', methods=['POST'])
 def index():
     auth_header = request.headers.get('Authorization')
@@ -346,29 +475,94 @@ def index():
     if file.content_length > MAX_SIZE:
         return jsonify({"success": False, "message": "File too large. Maximum size is 50MB"}), 413
 
+    sample_fps = request.form.get('sample_fps', DEFAULT_SAMPLE_FPS, type=float)
+    if not 0 < sample_fps <= MAX_SAMPLE_FPS:
+        return jsonify({"success": False, "message": f"sample_fps must be between 0 and {MAX_SAMPLE_FPS:g}"}), 400
+
+    run_async = request.args.get('async', request.form.get('async', str(INDEX_ASYNC))).lower() in ('1', 'true', 'yes')
+
     file_path = None
     try:
-        filename = secure_filename(file.filename)
+        filename = f"{uuid.uuid4().hex}_{secure_filename(file.filename)}"
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-        result, status = analyze_media(file_path, user_id)
+        content_hash = save_and_hash(file.stream, file_path, MAX_SIZE)
+        lookup_start = time.perf_counter()
+        cached = result_cache.get(result_cache_key(content_hash, file_path, sample_fps)) if run_async else None
+        if cached:
+            result, status = serve_cached_result(cached, user_id, lookup_start)
+        elif run_async:
+            queued_path, file_path = file_path, None  # the job removes the upload when it finishes
+            job_id = job_queue.submit(user_id, analyze_media, queued_path, user_id, sample_fps, content_hash, check_cache=False, on_done=lambda: remove_upload(queued_path))
+            return jsonify({"success": True, "job_id": job_id, "status_url": f"/jobs/{job_id}", "result_url": f"/jobs/{job_id}/result"}), 202
+        else:
+            result, status = analyze_media(file_path, user_id, sample_fps, content_hash)
         return jsonify({"success": status == 200, "message": result.get("error") if status != 200 else None, "result": result if status == 200 else None}), status
+    except UploadTooLargeError:
+        return jsonify({"success": False, "message": "File too large. Maximum size is 50MB"}), 413
+    except QueueFullError:
+        remove_upload(queued_path)
+        return jsonify({"success": False, "message": "Analysis queue is full. Please try again later."}), 503
     except Exception as e:
         logger.error(f"Server error during analysis: {e}")
         return jsonify({"success": False, "message": f"Server error: {str(e)}"}), 500
     finally:
-        if file_path and os.path.exists(file_path):
-            for _ in range(3):  # Retry deletion
-                try:
-                    os.remove(file_path)
-                    logger.info(f"Deleted file: {file_path}")
-                    break
-                except PermissionError:
-                    logger.warning(f"Retrying file deletion: {file_path}")
-                    time.sleep(0.5)
-                except Exception as e:
-                    logger.error(f"Failed to delete file {file_path}: {e}")
-                    break
+        remove_upload(file_path)
+
+# Look up a job owned by the authenticated caller
+def get_user_job(job_id):
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None, (jsonify({"success": False, "message": "Unauthorized"}), 401)
+
+    token = auth_header.split(" ")[1]
+    token_response = validate_token(token)
+    if not token_response.get("success"):
+        return None, (jsonify({"success": False, "message": token_response.get("message", "Invalid token")}), 401)
+
+    user_id = token_response.get("user").get("id")
+    job = job_queue.get(job_id)
+    if not job or job["owner"] != user_id:
+        return None, (jsonify({"success": False, "message": "Job not found or expired"}), 404)
+    return job, None
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job, error_response = get_user_job(job_id)
+    if error_response:
+        return error_response
+    return jsonify({
+        "success": True,
+        "job_id": job["id"],
+        "status": job["status"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+        "message": job["error"]
+    })
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job, error_response = get_user_job(job_id)
+    if error_response:
+        return error_response
+    if job["status"] in ("queued", "running"):
+        return jsonify({"success": False, "status": job["status"], "message": "Analysis still running"}), 202
+    status = job["status_code"]
+    result = job["result"] if status == 200 else None
+    return jsonify({"success": status == 200, "status": job["status"], "message": job["error"], "result": result}), status
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return jsonify({
+        "success": True,
+        "metrics": {
+            "auth": token_validator.stats(),
+            "db": db_pool.stats(),
+            "write_behind": results_writer.stats() if results_writer else None,
+            "result_cache": result_cache.stats(),
+            "jobs": job_queue.stats()
+        }
+    })
 
 @app.route('/reports', methods=['GET'])
 def reports():
@@ -384,19 +578,38 @@ def reports():
     user_id = token_response.get("user").get("id")
 
     try:
-        cursor = db.cursor()
-        cursor.execute(
-            'SELECT id, user_id, pronunciation_assessment, suggestion, most_repeated_words, filler_words, confident_percentage, not_confident_percentage, created_at '
-            'FROM analysis_results WHERE user_id = %s ORDER BY created_at DESC',
-            (user_id,)
-        )
-        results = cursor.fetchall()
+        page = parse_page_request(request.args, REPORT_COLUMNS, 'created_at')
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    try:
+        results, next_cursor = fetch_page(db_pool, 'analysis_results', 'created_at', user_id, page)
         logger.info(f"Retrieved {len(results)} reports for user_id: {user_id}")
-        return jsonify(results)
+        return paged_response(jsonify(results), request, next_cursor)
     except Exception as e:
         logger.error(f"Failed to fetch reports: {e}")
         return jsonify({"success": False, "message": "Failed to fetch reports"}), 500
 
+@app.route('/reports/summary', methods=['GET'])
+def reports_summary():
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return jsonify({"success": False, "message": "Unauthorized"}), 401
+
+    token = auth_header.split(" ")[1]
+    token_response = validate_token(token)
+    if not token_response.get("success"):
+        return jsonify({"success": False, "message": token_response.get("message", "Invalid token")}), 401
+
+    user_id = token_response.get("user").get("id")
+
+    try:
+        summary = read_summary(db_pool, user_id)
+        return jsonify({"success": True, "summary": summary})
+    except Exception as e:
+        logger.error(f"Failed to fetch report summary: {e}")
+        return jsonify({"success": False, "message": "Failed to fetch report summary"}), 500
+
 if __name__ == '__main__':
     logger.info("Starting Flask server on port 5000")
     app.run(debug=True, port=5000)
\ No newline at end of file